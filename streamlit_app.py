@@ -5,16 +5,146 @@ import pandas as pd
 from datetime import datetime
 import io
 import base64
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Iterator, Callable, IO, Tuple
 import os
 from pathlib import Path
 import logging
 from logging.handlers import TimedRotatingFileHandler
+import threading
+import time
+import queue
+import uuid
+import sys
+import types
+import pickle
+import weakref
+from collections import deque, OrderedDict
+from collections.abc import Mapping, MutableMapping
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from itertools import islice
+import re
+import random
+import cProfile
+import pstats
+import marshal
+import tracemalloc
+import hmac
+import csv
+import hashlib
+import shutil
+import tempfile
+import zipfile
+from PIL import Image, ImageDraw
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from streamlit.runtime.uploaded_file_manager import UploadedFile
+from urllib3 import Timeout
+from urllib3.exceptions import ReadTimeoutError, HTTPError as Urllib3Error
+
+try:
+    import orjson
+except ImportError:  # Faster JSON decoding is optional
+    orjson = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export is optional
+    pa = None
+    pq = None
 
 # Configuration
 API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8000")
 TEST_API_KEY = "" #os.getenv("TEST_API_KEY")
 
+# Operator mode (profiling, admin views) is only offered when a token is configured
+OPERATOR_TOKEN = os.getenv("OPERATOR_TOKEN", "")
+PROFILER_TOP_N = 25
+PROFILER_TRACEBACK_DEPTH = 1
+PROFILER_KEEP_RESULTS = 5
+
+# Per-session memory accounting
+SESSION_MEMORY_BUDGET_MB = float(os.getenv("SESSION_MEMORY_BUDGET_MB", "256"))
+GLOBAL_MEMORY_BUDGET_MB = float(os.getenv("GLOBAL_MEMORY_BUDGET_MB", "2048"))
+# What happens to least recently used results over budget: "spill" them to disk or "evict" them
+SESSION_OVERFLOW_POLICY = os.getenv("SESSION_OVERFLOW_POLICY", "spill")
+SESSION_SPILL_DIR = os.getenv("SESSION_SPILL_DIR") or tempfile.gettempdir()
+REQUEST_HISTORY_MAX_ENTRIES = int(os.getenv("REQUEST_HISTORY_MAX_ENTRIES", "1000"))
+
+# Health probing / circuit breaker configuration
+HEALTH_ENDPOINT = "/health"
+HEALTH_PROBE_INTERVAL = float(os.getenv("HEALTH_PROBE_INTERVAL", "10"))
+HEALTH_PROBE_TIMEOUT = float(os.getenv("HEALTH_PROBE_TIMEOUT", "3"))
+HEALTH_WINDOW_SIZE = int(os.getenv("HEALTH_WINDOW_SIZE", "30"))
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "3"))
+BREAKER_RESET_TIMEOUT = float(os.getenv("BREAKER_RESET_TIMEOUT", "30"))
+
+# End-to-end deadlines (seconds) per endpoint, covering connect, upload and read; overridable in the sidebar
+DEFAULT_REQUEST_DEADLINE = float(os.getenv("DEFAULT_REQUEST_DEADLINE", "60"))
+ENDPOINT_DEADLINES = {
+    "/health": 10.0,
+    "/v1/tags/resolve/multi": 120.0,
+    "/v1/tags/resolve/upload": 60.0,
+    "/v1/translate": 60.0,
+    "/v1/translate/multi": 180.0,
+    "/v1/image/full-localization-pipeline": 300.0
+}
+# Remaining budget in milliseconds, sent so the backend can give up on work nobody is waiting for
+DEADLINE_HEADER = os.getenv("DEADLINE_HEADER", "X-Request-Timeout-Ms")
+DEADLINE_POLL_INTERVAL = 0.25
+
+# Streaming responses
+STREAM_ACCEPT_HEADER = "application/x-ndjson, text/event-stream;q=0.9, application/json;q=0.8"
+STREAM_CHUNK_SIZE = 1024
+# Error bodies are only logged and shown, so stop reading them after this much
+ERROR_BODY_MAX_BYTES = 64 * 1024
+
+# JSON decoding
+# Decoded nested JSON kept per session, by estimated size of the decoded objects
+JSON_DECODE_CACHE_MB = float(os.getenv("JSON_DECODE_CACHE_MB", "32"))
+TRANSLATION_PREVIEW_NODES = 3
+
+# Image deduplication configuration
+DEDUP_MAX_HAMMING_DISTANCE = int(os.getenv("DEDUP_MAX_HAMMING_DISTANCE", "5"))
+DEDUP_CACHE_SIZE = int(os.getenv("DEDUP_CACHE_SIZE", "200"))
+DEDUP_CACHE_MB = float(os.getenv("DEDUP_CACHE_MB", "32"))
+
+# Default number of localization pipelines run at once in multi-locale mode
+LOCALIZATION_MAX_CONCURRENCY = int(os.getenv("LOCALIZATION_MAX_CONCURRENCY", "3"))
+
+# Record & replay configuration
+RECORDINGS_DIR = Path(os.getenv("RECORDINGS_DIR", "recordings"))
+REPLAY_MAX_DIFFS = 20
+
+# Synthetic corpus generator configuration
+CORPUS_NODE_TYPES = ["heading", "paragraph", "button", "link", "label", "list_item"]
+CORPUS_IMAGE_FORMATS = {"PNG": ("png", "image/png"), "JPEG": ("jpg", "image/jpeg"), "WEBP": ("webp", "image/webp")}
+CORPUS_VOCABULARY = (
+    "welcome our website learn more about products services contact support team pricing plans features "
+    "free trial sign up log in account settings privacy policy terms conditions download now get started "
+    "customer stories enterprise solutions secure fast reliable cloud platform analytics dashboard reports "
+    "integrations partners careers blog news events help center documentation community newsletter subscribe "
+    "today discover explore compare choose upgrade save offer limited time shipping returns order checkout"
+).split()
+
+# Export configuration
+EXPORT_SPOOL_MAX_BYTES = int(os.getenv("EXPORT_SPOOL_MAX_BYTES", str(8 * 1024 * 1024)))
+EXPORT_PARQUET_BATCH_SIZE = 1000
+# Request history columns exported to CSV/Parquet, with their Arrow types
+HISTORY_EXPORT_COLUMNS = {
+    "timestamp": "string",
+    "endpoint": "string",
+    "method": "string",
+    "status_code": "int64",
+    "outcome": "string",
+    "deadline": "double",
+    "response_time": "double",
+    "time_to_first_result": "double",
+    "decode_time": "double",
+    "streamed": "bool",
+    "success": "bool",
+    "error": "string"
+}
+
 # Create logs directory if it doesn't exist
 LOGS_DIR = Path("logs")
 LOGS_DIR.mkdir(exist_ok=True)
@@ -158,10 +288,1032 @@ if 'api_key' not in st.session_state:
     st.session_state.api_key = TEST_API_KEY
     logger.info("Initialized API Key from environment")
 
+if 'endpoint_deadlines' not in st.session_state:
+    st.session_state.endpoint_deadlines = dict(ENDPOINT_DEADLINES)
+    logger.info("Initialized endpoint deadlines")
+
+# Profiling
+def is_operator() -> bool:
+    return bool(OPERATOR_TOKEN) and st.session_state.get("operator_mode", False)
+
+
+class TracemallocUsers:
+    """Process-wide count of running profiles: the first one starts tracemalloc, the last one stops it"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._users = 0
+        self._owned = False
+
+    def acquire(self) -> bool:
+        """Register a profile; returns True if tracing was already running before it"""
+        with self._lock:
+            already_tracing = tracemalloc.is_tracing()
+            if not already_tracing:
+                tracemalloc.start(PROFILER_TRACEBACK_DEPTH)
+                self._owned = True
+            self._users += 1
+            return already_tracing
+
+    def release(self):
+        with self._lock:
+            self._users -= 1
+            if self._users == 0 and self._owned:
+                tracemalloc.stop()
+                self._owned = False
+
+
+@st.cache_resource
+def get_tracemalloc_users() -> TracemallocUsers:
+    return TracemallocUsers()
+
+
+class ProfileSession:
+    """cProfile + tracemalloc around one script run or one endpoint call"""
+
+    def __init__(self, label: str, tracemalloc_users: TracemallocUsers):
+        self.label = label
+        self.profiler = cProfile.Profile()
+        self.tracemalloc_users = tracemalloc_users
+        self.baseline = None
+        self.wall_start = 0.0
+        self.result = None
+
+    def start(self):
+        if self.tracemalloc_users.acquire():
+            # Another profile (or tool) is tracing: report only what changed while we ran
+            self.baseline = tracemalloc.take_snapshot()
+        self.wall_start = time.perf_counter()
+        self.profiler.enable()
+
+    def stop(self) -> Dict:
+        self.profiler.disable()
+        wall_time = time.perf_counter() - self.wall_start
+
+        try:
+            snapshot = tracemalloc.take_snapshot().filter_traces([
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>")
+            ])
+            _, peak_memory = tracemalloc.get_traced_memory()
+        finally:
+            self.tracemalloc_users.release()
+
+        if self.baseline is not None:
+            allocation_stats = snapshot.compare_to(self.baseline, "lineno")
+            allocations = [{"location": str(stat.traceback), "size_kb": stat.size_diff / 1024, "count": stat.count_diff}
+                           for stat in allocation_stats[:PROFILER_TOP_N]]
+        else:
+            allocation_stats = snapshot.statistics("lineno")
+            allocations = [{"location": str(stat.traceback), "size_kb": stat.size / 1024, "count": stat.count}
+                           for stat in allocation_stats[:PROFILER_TOP_N]]
+
+        stats = pstats.Stats(self.profiler, stream=io.StringIO())
+        functions = sorted(
+            ({"function": f"{'/'.join(Path(filename).parts[-2:])}:{line}({name})", "calls": total_calls,
+              "tottime": total_time, "cumtime": cumulative_time}
+             for (filename, line, name), (_, total_calls, total_time, cumulative_time, _) in stats.stats.items()),
+            key=lambda row: row["cumtime"],
+            reverse=True
+        )[:PROFILER_TOP_N]
+
+        self.profiler.create_stats()
+        self.result = {
+            "label": self.label,
+            "timestamp": datetime.now().isoformat(),
+            "wall_time": wall_time,
+            "peak_memory": peak_memory,
+            "functions": functions,
+            "allocations": allocations,
+            # Same format as cProfile's dump_stats: load with pstats.Stats(path)
+            "raw_profile": marshal.dumps(self.profiler.stats)
+        }
+        return self.result
+
+
+def claim_profile(kind: str, label: str) -> Optional[ProfileSession]:
+    """Unstarted profile session if the operator armed the profiler for this kind of work ("script" or "call")"""
+    if st.session_state.get("profile_request") != kind or not is_operator():
+        return None
+    st.session_state.profile_request = None
+    logger.info(f"Profiling started: {label}")
+    return ProfileSession(label, get_tracemalloc_users())
+
+def start_profile(kind: str, label: str) -> Optional[ProfileSession]:
+    session = claim_profile(kind, label)
+    if session is not None:
+        session.start()
+    return session
+
+def finish_profile(session: ProfileSession):
+    store_profile_result(session.stop())
+
+def store_profile_result(result: Dict):
+    st.session_state.profile_results = [result] + st.session_state.get("profile_results", [])[:PROFILER_KEEP_RESULTS - 1]
+    logger.info(f"Profiling finished: {result['label']} ({result['wall_time']:.3f}s, peak {result['peak_memory'] / 1024:.0f} KB)")
+
+def render_profile_reports():
+    for idx, result in enumerate(st.session_state.get("profile_results", [])):
+        title = f"🔬 Profile: {result['label']} · {result['wall_time']:.3f}s · peak {result['peak_memory'] / (1024 * 1024):.1f} MB · {result['timestamp'][11:19]}"
+        with st.expander(title, expanded=idx == 0):
+            st.markdown("**Top functions by cumulative time**")
+            st.dataframe(pd.DataFrame(result["functions"]), use_container_width=True, hide_index=True)
+            st.markdown("**Top allocation sites**")
+            st.caption("tracemalloc is process-wide, so allocations made by other sessions at the same time are included")
+            st.dataframe(pd.DataFrame(result["allocations"]), use_container_width=True, hide_index=True)
+            st.download_button(
+                "📥 Download raw profile (.prof)",
+                data=result["raw_profile"],
+                file_name=f"profile_{result['timestamp'].replace(':', '').replace('-', '')[:15]}.prof",
+                mime="application/octet-stream",
+                key=f"download_profile_{result['timestamp']}"
+            )
+
+# A previous profiled run that ended early (st.rerun, exception) never reached the end of the script
+interrupted_profile = st.session_state.pop("active_profile", None)
+if interrupted_profile is not None:
+    interrupted_profile.label += " (interrupted)"
+    finish_profile(interrupted_profile)
+
+# Profile this script run if the operator armed it; finished at the end of the script
+st.session_state.active_profile = start_profile("script", "Script run")
+
+# Session Memory Accounting
+def estimate_size(obj: Any, seen: Optional[set] = None) -> int:
+    """Approximate deep size of obj in bytes; objects whose id is already in seen are not counted again"""
+    seen = set() if seen is None else seen
+    size = 0
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen or isinstance(item, (type, types.ModuleType)):
+            continue
+        seen.add(id(item))
+        # BytesIO (uploads, corpus files) and DataFrames report their buffers here
+        size += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset, deque)):
+            stack.extend(item)
+        elif hasattr(item, "__dict__"):
+            stack.append(vars(item))
+    return size
+
+
+class ResultStore(MutableMapping):
+    """A session's test results, sized on write and kept in LRU order.
+
+    Least recently used results can be spilled to disk (reads go to the file, the result
+    stays out of memory) or evicted, to keep the session within its memory budget.
+    """
+
+    def __init__(self, session_id: str, spill_dir: Path, results: Optional[Dict] = None):
+        self.session_id = session_id
+        self.spill_dir = spill_dir
+        self.budget = SESSION_MEMORY_BUDGET_MB * 1024 * 1024
+        self.evicted: List[str] = []
+        self._lock = threading.RLock()
+        self._keys: Dict[str, None] = {}  # every stored key, in insertion order
+        self._memory: "OrderedDict[str, Any]" = OrderedDict()  # least recently used first
+        self._last_used: Dict[str, float] = {}
+        self._sizes: Dict[str, int] = {}
+        self._spilled: Dict[str, Path] = {}
+        weakref.finalize(self, shutil.rmtree, spill_dir, True)
+        self.update(results or {})
+
+    def __getitem__(self, key: str) -> Any:
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self._last_used[key] = time.monotonic()
+                return self._memory[key]
+            if key not in self._spilled:
+                raise KeyError(key)
+            with open(self._spilled[key], "rb") as f:
+                return pickle.load(f)
+
+    def __setitem__(self, key: str, value: Any):
+        size = estimate_size(value)
+        with self._lock:
+            self._discard(key)
+            self._keys[key] = None
+            self._memory[key] = value
+            self._last_used[key] = time.monotonic()
+            self._sizes[key] = size
+            if key in self.evicted:
+                self.evicted.remove(key)
+            self.shrink_to(self.budget)
+
+    def __delitem__(self, key: str):
+        with self._lock:
+            if key not in self._keys:
+                raise KeyError(key)
+            self._discard(key)
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            return iter(list(self._keys))
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def clear(self):
+        with self._lock:
+            for key in list(self._keys):
+                self._discard(key)
+            self.evicted.clear()
+
+    def _discard(self, key: str):
+        self._keys.pop(key, None)
+        self._memory.pop(key, None)
+        self._last_used.pop(key, None)
+        self._sizes.pop(key, None)
+        path = self._spilled.pop(key, None)
+        if path is not None:
+            path.unlink(missing_ok=True)
+
+    def is_spilled(self, key: str) -> bool:
+        return key in self._spilled
+
+    @property
+    def memory_bytes(self) -> int:
+        with self._lock:
+            return sum(self._sizes[key] for key in self._memory)
+
+    @property
+    def spilled_bytes(self) -> int:
+        with self._lock:
+            return sum(self._sizes[key] for key in self._spilled)
+
+    def oldest_use(self) -> Optional[float]:
+        with self._lock:
+            return self._last_used[next(iter(self._memory))] if self._memory else None
+
+    def release_oldest(self) -> int:
+        """Spill or evict the least recently used in-memory result, returning the bytes freed"""
+        with self._lock:
+            if not self._memory:
+                return 0
+            key, value = self._memory.popitem(last=False)
+            self._last_used.pop(key, None)
+            size = self._sizes[key]
+            if SESSION_OVERFLOW_POLICY == "spill":
+                path = self.spill_dir / f"{hashlib.sha256(key.encode('utf-8')).hexdigest()[:16]}.pkl"
+                try:
+                    self.spill_dir.mkdir(parents=True, exist_ok=True)
+                    with open(path, "wb") as f:
+                        pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+                    self._spilled[key] = path
+                    logger.info(f"💾 Spilled result '{key}' ({size / 1024:.0f} KB) to disk for session {self.session_id[:8]}")
+                    return size
+                except (OSError, pickle.PicklingError) as e:
+                    logger.error(f"Failed to spill result '{key}', evicting it instead: {e}")
+            self._keys.pop(key, None)
+            self._sizes.pop(key, None)
+            self.evicted.append(key)
+            logger.info(f"🗑️ Evicted result '{key}' ({size / 1024:.0f} KB) for session {self.session_id[:8]}")
+            return size
+
+    def shrink_to(self, limit: float) -> int:
+        freed = 0
+        with self._lock:
+            while self._memory and self.memory_bytes > limit:
+                freed += self.release_oldest()
+        return freed
+
+
+class SessionMemoryRegistry:
+    """Process-wide table of per-session memory usage, used to enforce the global budget"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sessions: Dict[str, Dict] = {}
+        Path(SESSION_SPILL_DIR).mkdir(parents=True, exist_ok=True)
+        self.spill_root = Path(tempfile.mkdtemp(prefix="session-spill-", dir=SESSION_SPILL_DIR))
+        weakref.finalize(self, shutil.rmtree, self.spill_root, True)
+
+    def create_store(self, session_id: str, results: Optional[Dict] = None) -> ResultStore:
+        store = ResultStore(session_id, self.spill_root / f"{session_id}-{uuid.uuid4().hex[:8]}", results)
+        with self._lock:
+            self._sessions[session_id] = {"store": weakref.ref(store), "caches": [], "usage": {}, "last_seen": datetime.now()}
+        return store
+
+    def _live_sessions(self) -> Dict[str, Dict]:
+        # Sessions whose state Streamlit has dropped no longer hold their store
+        for session_id in [sid for sid, entry in self._sessions.items() if entry["store"]() is None]:
+            del self._sessions[session_id]
+        return self._sessions
+
+    def report(self, session_id: str, usage: Dict[str, int], caches: Optional[List[Any]] = None):
+        """Record a session's usage and the caches (objects with nbytes and shrink_to) it can give up"""
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is not None:
+                entry["usage"] = usage
+                entry["caches"] = [weakref.ref(cache) for cache in caches or []]
+                entry["last_seen"] = datetime.now()
+
+    def usage(self, session_id: str) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._sessions.get(session_id, {}).get("usage", {}))
+
+    def total(self) -> int:
+        with self._lock:
+            return sum(entry["usage"].get("total", 0) for entry in self._live_sessions().values())
+
+    def enforce_global(self, budget: float) -> int:
+        """Bring all sessions within the budget: caches of the least recently seen sessions first,
+        then the least recently used results across sessions"""
+        freed = 0
+        with self._lock:
+            sessions = self._live_sessions()
+            total = sum(entry["usage"].get("total", 0) for entry in sessions.values())
+            for entry in sorted(sessions.values(), key=lambda entry: entry["last_seen"]):
+                for cache in (ref() for ref in entry["caches"]):
+                    if cache is None or total <= budget:
+                        continue
+                    released = cache.shrink_to(max(0, cache.nbytes - (total - budget)))
+                    usage = entry["usage"]
+                    usage["caches"] = usage.get("caches", 0) - released
+                    usage["total"] = usage.get("total", 0) - released
+                    total -= released
+                    freed += released
+            while total > budget:
+                candidates = [(store.oldest_use(), session_id, store) for session_id, entry in sessions.items()
+                              if (store := entry["store"]()) is not None and store.oldest_use() is not None]
+                if not candidates:
+                    break
+                _, session_id, store = min(candidates, key=lambda candidate: candidate[0])
+                released = store.release_oldest()
+                usage = sessions[session_id]["usage"]
+                usage["results"] = usage.get("results", 0) - released
+                usage["total"] = usage.get("total", 0) - released
+                usage["spilled"] = store.spilled_bytes
+                total -= released
+                freed += released
+        return freed
+
+    def snapshot(self) -> List[Dict]:
+        with self._lock:
+            rows = []
+            for session_id, entry in self._live_sessions().items():
+                store = entry["store"]()
+                usage = entry["usage"]
+                rows.append({
+                    "session": session_id[:8],
+                    "total_mb": usage.get("total", 0) / (1024 * 1024),
+                    "results_mb": usage.get("results", 0) / (1024 * 1024),
+                    "history_mb": usage.get("history", 0) / (1024 * 1024),
+                    "uploads_mb": usage.get("uploads", 0) / (1024 * 1024),
+                    "caches_mb": usage.get("caches", 0) / (1024 * 1024),
+                    "other_mb": usage.get("other", 0) / (1024 * 1024),
+                    "on_disk_mb": usage.get("spilled", 0) / (1024 * 1024),
+                    "results": len(store) if store is not None else 0,
+                    "evicted": len(store.evicted) if store is not None else 0,
+                    "last_seen": entry["last_seen"].strftime("%H:%M:%S")
+                })
+        return sorted(rows, key=lambda row: row["total_mb"], reverse=True)
+
+
+@st.cache_resource
+def get_memory_registry() -> SessionMemoryRegistry:
+    return SessionMemoryRegistry()
+
+def current_session_id() -> str:
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else "local"
+
+def session_caches() -> List[Any]:
+    """This session's reclaimable caches, in the order they are given up"""
+    return [get_decoded_json_cache(), get_dedup_cache()]
+
+def measure_session_memory() -> Dict[str, int]:
+    """Estimated bytes this session holds, by category"""
+    store = st.session_state.test_results
+    uploads = 0
+    other = 0
+    seen = set()
+    for key, value in st.session_state.items():
+        # Caches keep their own byte counts and hold no objects shared with test_results
+        if key in ("test_results", "request_history", "decoded_json_cache", "dedup_cache"):
+            continue
+        files = value if isinstance(value, list) else [value]
+        if files and all(isinstance(item, UploadedFile) for item in files):
+            uploads += sum(item.size for item in files)
+        else:
+            other += estimate_size(value, seen)
+    usage = {
+        "results": store.memory_bytes,
+        "spilled": store.spilled_bytes,
+        "history": estimate_size(st.session_state.request_history),
+        "uploads": uploads,
+        "caches": sum(cache.nbytes for cache in session_caches()),
+        "other": other
+    }
+    usage["total"] = usage["results"] + usage["history"] + usage["uploads"] + usage["caches"] + usage["other"]
+    return usage
+
+def enforce_memory_budgets():
+    """Fit this session into its budget, then all sessions into the global budget"""
+    session_budget = SESSION_MEMORY_BUDGET_MB * 1024 * 1024
+    store = st.session_state.test_results
+    history = st.session_state.request_history
+    if len(history) > REQUEST_HISTORY_MAX_ENTRIES:
+        del history[:len(history) - REQUEST_HISTORY_MAX_ENTRIES]
+
+    usage = measure_session_memory()
+    caches = session_caches()
+    # Caches only save recomputation, so they are given up before any result
+    cache_freed = 0
+    for cache in caches:
+        over = usage["total"] - cache_freed - session_budget
+        if over <= 0:
+            break
+        cache_freed += cache.shrink_to(max(0, cache.nbytes - over))
+    usage["caches"] -= cache_freed
+    usage["total"] -= cache_freed
+
+    # Results get whatever the rest of the session leaves over
+    store.budget = max(0, session_budget - (usage["total"] - usage["results"]))
+    freed = store.shrink_to(store.budget)
+    if freed or cache_freed:
+        logger.warning(f"Session {store.session_id[:8]} over its {SESSION_MEMORY_BUDGET_MB:.0f} MB budget, released "
+                       f"{cache_freed / (1024 * 1024):.1f} MB of caches and {freed / (1024 * 1024):.1f} MB of results")
+        usage["results"] -= freed
+        usage["total"] -= freed
+        usage["spilled"] = store.spilled_bytes
+
+    memory_registry.report(store.session_id, usage, caches)
+    global_budget = GLOBAL_MEMORY_BUDGET_MB * 1024 * 1024
+    if memory_registry.total() > global_budget:
+        freed = memory_registry.enforce_global(global_budget)
+        logger.warning(f"Sessions over the {GLOBAL_MEMORY_BUDGET_MB:.0f} MB global budget, released {freed / (1024 * 1024):.1f} MB of caches and results")
+
+def process_rss() -> Optional[int]:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+def render_memory_admin():
+    rows = memory_registry.snapshot()
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Sessions", len(rows))
+    with col2:
+        st.metric("Tracked Memory", f"{sum(row['total_mb'] for row in rows):.1f} MB",
+                  help=f"Global budget: {GLOBAL_MEMORY_BUDGET_MB:.0f} MB")
+    with col3:
+        st.metric("Spilled to Disk", f"{sum(row['on_disk_mb'] for row in rows):.1f} MB")
+    with col4:
+        rss = process_rss()
+        st.metric("Process RSS", f"{rss / (1024 * 1024):.0f} MB" if rss is not None else "N/A")
+    if rows:
+        st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+
+# Test results live in a ResultStore so they can be sized, spilled and evicted
+memory_registry = get_memory_registry()
+if not isinstance(st.session_state.test_results, ResultStore):
+    st.session_state.test_results = memory_registry.create_store(current_session_id(), st.session_state.test_results)
+
+# Health Monitoring & Circuit Breakers
+class CircuitBreaker:
+    """Per-endpoint circuit breaker (closed -> open -> half-open -> closed)"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, endpoint: str, failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+                 reset_timeout: float = BREAKER_RESET_TIMEOUT):
+        self.endpoint = endpoint
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.last_reason: Optional[str] = None
+        self._trial_in_flight = False
+        # Opened by failed health probes rather than by calls to this endpoint
+        self._tripped_by_probe = False
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        """Return True if a request may be sent, False to fail fast"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+
+            if self.state == self.OPEN:
+                if self.opened_at is not None and time.monotonic() - self.opened_at >= self.reset_timeout:
+                    self.state = self.HALF_OPEN
+                    logger.info(f"Circuit half-open after reset timeout: {self.endpoint}")
+                else:
+                    return False
+
+            # Half-open: let a single trial request through
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info(f"Circuit closed: {self.endpoint}")
+            self.state = self.CLOSED
+            self.failures = 0
+            self.opened_at = None
+            self.last_reason = None
+            self._trial_in_flight = False
+            self._tripped_by_probe = False
+
+    def record_cancelled(self):
+        """A cancelled call says nothing about backend health; just free the half-open trial slot"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self, reason: str):
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self._trip(reason)
+
+    def trip(self, reason: str, by_probe: bool = False):
+        with self._lock:
+            self._trip(reason, by_probe)
+
+    def _trip(self, reason: str, by_probe: bool = False):
+        if self.state != self.OPEN:
+            logger.warning(f"Circuit opened: {self.endpoint} - {reason}")
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+        self.last_reason = reason
+        self._trial_in_flight = False
+        self._tripped_by_probe = by_probe
+
+    def probe_recovered(self):
+        """Backend health probe succeeded.
+
+        A circuit the probes opened closes again: the healthy probe is its recovery trial, so a
+        batch started right after doesn't fail fast on every call but one. A circuit opened by
+        failing calls to this endpoint only moves to half-open and waits for a trial call.
+        """
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            if self._tripped_by_probe:
+                self.state = self.CLOSED
+                self.failures = 0
+                self.opened_at = None
+                self.last_reason = None
+                self._trial_in_flight = False
+                self._tripped_by_probe = False
+                logger.info(f"Circuit closed after healthy probe: {self.endpoint}")
+            elif self.state == self.OPEN:
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+                logger.info(f"Circuit half-open after healthy probe: {self.endpoint}")
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "endpoint": self.endpoint,
+                "state": self.state,
+                "failures": self.failures,
+                "reason": self.last_reason or ""
+            }
+
+
+class CircuitBreakerRegistry:
+    """Holds one circuit breaker per endpoint for a single API base URL"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Last failed health probe, applied to breakers created while the backend is down
+        self._probe_failure: Optional[str] = None
+        # Known endpoints get breakers up front so a failed probe opens them before their first call
+        self._breakers: Dict[str, CircuitBreaker] = {
+            endpoint: CircuitBreaker(endpoint) for endpoint in ENDPOINT_DEADLINES if endpoint != HEALTH_ENDPOINT
+        }
+
+    def get(self, endpoint: str) -> CircuitBreaker:
+        with self._lock:
+            if endpoint not in self._breakers:
+                breaker = CircuitBreaker(endpoint)
+                if self._probe_failure is not None:
+                    breaker.trip(self._probe_failure, by_probe=True)
+                self._breakers[endpoint] = breaker
+            return self._breakers[endpoint]
+
+    def trip_all(self, reason: str):
+        with self._lock:
+            self._probe_failure = reason
+            breakers = list(self._breakers.values())
+        for breaker in breakers:
+            breaker.trip(reason, by_probe=True)
+
+    def probe_recovered(self):
+        with self._lock:
+            self._probe_failure = None
+            breakers = list(self._breakers.values())
+        for breaker in breakers:
+            breaker.probe_recovered()
+
+    def snapshot(self) -> List[Dict]:
+        with self._lock:
+            breakers = list(self._breakers.values())
+        return [breaker.snapshot() for breaker in breakers]
+
+
+class HealthProber:
+    """Background thread polling the health endpoint and driving the circuit breakers"""
+
+    def __init__(self, base_url: str, api_key: str, registry: CircuitBreakerRegistry):
+        self.base_url = base_url
+        self.api_key = api_key
+        self.registry = registry
+        self.samples = deque(maxlen=HEALTH_WINDOW_SIZE)
+        self.consecutive_failures = 0
+        self.last_accessed = time.monotonic()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        # Stop polling once no session has looked at this prober for a while
+        self.idle_timeout = max(HEALTH_PROBE_INTERVAL * 5, 60)
+
+    def ensure_running(self):
+        with self._lock:
+            self.last_accessed = time.monotonic()
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name=f"health-prober-{self.base_url}", daemon=True)
+                self._thread.start()
+                logger.info(f"Started background health prober for {self.base_url}")
+
+    def _run(self):
+        while time.monotonic() - self.last_accessed < self.idle_timeout:
+            self.probe_once()
+            time.sleep(HEALTH_PROBE_INTERVAL)
+        logger.info(f"Background health prober idle, stopping: {self.base_url}")
+
+    def probe_once(self) -> bool:
+        url = f"{self.base_url}{HEALTH_ENDPOINT}"
+        start = time.perf_counter()
+        error = None
+        try:
+            response = requests.get(url, headers={"X-API-Key": self.api_key}, timeout=HEALTH_PROBE_TIMEOUT)
+            healthy = response.ok
+            if not healthy:
+                error = f"HTTP {response.status_code}"
+        except requests.exceptions.RequestException as e:
+            healthy = False
+            error = str(e)
+        latency = time.perf_counter() - start
+
+        with self._lock:
+            self.samples.append({
+                "timestamp": datetime.now().isoformat(),
+                "healthy": healthy,
+                "latency": latency,
+                "error": error
+            })
+
+        if healthy:
+            self.consecutive_failures = 0
+            self.registry.probe_recovered()
+        else:
+            self.consecutive_failures += 1
+            logger.warning(f"Health probe failed ({self.consecutive_failures}/{BREAKER_FAILURE_THRESHOLD}): {url} - {error}")
+            # One slow /health while the backend is busy is not an outage
+            if self.consecutive_failures >= BREAKER_FAILURE_THRESHOLD:
+                self.registry.trip_all(f"{self.consecutive_failures} health probes failed: {error}")
+
+        return healthy
+
+    def stats(self) -> Dict:
+        """Rolling availability and latency over the probe window"""
+        with self._lock:
+            samples = list(self.samples)
+
+        if not samples:
+            return {"samples": 0}
+
+        latencies = sorted(s["latency"] for s in samples if s["healthy"])
+        return {
+            "samples": len(samples),
+            "healthy": samples[-1]["healthy"],
+            "last_checked": samples[-1]["timestamp"],
+            "last_error": samples[-1]["error"],
+            "last_latency": samples[-1]["latency"],
+            "availability": sum(1 for s in samples if s["healthy"]) / len(samples) * 100,
+            "avg_latency": sum(latencies) / len(latencies) if latencies else None,
+            "p95_latency": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] if latencies else None
+        }
+
+
+@st.cache_resource
+def get_breaker_registry(base_url: str) -> CircuitBreakerRegistry:
+    """Circuit breakers are shared by all sessions talking to the same backend"""
+    return CircuitBreakerRegistry()
+
+
+@st.cache_resource
+def get_health_prober(base_url: str, api_key: str) -> HealthProber:
+    return HealthProber(base_url, api_key, get_breaker_registry(base_url))
+
+
+def get_circuit_breaker(endpoint: str) -> CircuitBreaker:
+    return get_breaker_registry(st.session_state.api_base_url).get(endpoint)
+
+# JSON Decoding
+def json_loads(data: Any) -> Any:
+    """Decode JSON with orjson when it is installed, the standard library otherwise"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+class DecodedJsonCache:
+    """One session's decoded nested JSON results, keyed by a digest of their text and bounded by size.
+
+    Filled from the worker thread that received the response and read when the tab renders it.
+    Keys are digests so the cache doesn't keep result text alive after the ResultStore spills it.
+    """
+
+    def __init__(self, max_bytes: float = JSON_DECODE_CACHE_MB * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._entries: "OrderedDict[bytes, Tuple[bool, Any, int]]" = OrderedDict()
+        self._lock = threading.RLock()
+
+    def decode(self, text: str) -> Tuple[bool, Any]:
+        key = hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                ok, value, _ = self._entries[key]
+                return ok, value
+        try:
+            ok, value = True, json_loads(text)
+        except ValueError:
+            ok, value = False, None
+        size = estimate_size(value)
+        with self._lock:
+            if key not in self._entries and size <= self.max_bytes:
+                self._entries[key] = (ok, value, size)
+                self.nbytes += size
+                self.shrink_to(self.max_bytes)
+        return ok, value
+
+    def shrink_to(self, limit: float) -> int:
+        """Drop least recently used entries until the cache fits in limit bytes; returns bytes freed"""
+        freed = 0
+        with self._lock:
+            while self._entries and self.nbytes > limit:
+                _, (_, _, size) = self._entries.popitem(last=False)
+                self.nbytes -= size
+                freed += size
+        return freed
+
+
+def get_decoded_json_cache() -> DecodedJsonCache:
+    if 'decoded_json_cache' not in st.session_state:
+        st.session_state.decoded_json_cache = DecodedJsonCache()
+    return st.session_state.decoded_json_cache
+
+def decode_nested_json(value: Any, cache: Optional[DecodedJsonCache] = None) -> Tuple[bool, Any]:
+    """Decode a nested JSON string result, at most once per session when a cache is given.
+
+    Returns (ok, decoded). Cached values are shared by this session's renders, so they must not be mutated.
+    """
+    if not isinstance(value, str):
+        return True, value
+    if cache is not None:
+        return cache.decode(value)
+    try:
+        return True, json_loads(value)
+    except ValueError:
+        return False, None
+
+def _nested_json_payloads(endpoint: str, data: Any) -> List[str]:
+    """Nested JSON strings that an endpoint's tab renders in full"""
+    if endpoint == "/v1/tags/resolve/multi" and isinstance(data, list):
+        return [item["result"] for item in data if isinstance(item, dict) and isinstance(item.get("result"), str)]
+    if endpoint == "/v1/translate" and isinstance(data, dict) and isinstance(data.get("translated_json"), str):
+        return [data["translated_json"]]
+    return []
+
+def predecode_nested_json(endpoint: str, data: Any, cache: DecodedJsonCache) -> float:
+    """Warm the session's nested JSON cache for a response; returns seconds spent decoding"""
+    start = time.perf_counter()
+    for payload in _nested_json_payloads(endpoint, data):
+        decode_nested_json(payload, cache)
+    return time.perf_counter() - start
+
+_JSON_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_JSON_DECODER = json.JSONDecoder()
+
+def iter_json_array(text: str) -> Iterator[Any]:
+    """Decode the elements of a top-level JSON array one at a time"""
+    idx = _JSON_WHITESPACE.match(text, 0).end()
+    if text[idx:idx + 1] != "[":
+        raise ValueError("Expected a JSON array")
+    idx = _JSON_WHITESPACE.match(text, idx + 1).end()
+    if text[idx:idx + 1] == "]":
+        return
+
+    while True:
+        value, idx = _JSON_DECODER.raw_decode(text, idx)
+        yield value
+        idx = _JSON_WHITESPACE.match(text, idx).end()
+        separator = text[idx:idx + 1]
+        if separator == "]":
+            return
+        if separator != ",":
+            raise ValueError(f"Expected ',' or ']' at position {idx}")
+        idx = _JSON_WHITESPACE.match(text, idx + 1).end()
+
+def preview_json_array(text: str, count: int) -> List[Any]:
+    """First elements of a JSON array string, without decoding the rest"""
+    return list(islice(iter_json_array(text), count))
+
+# Deadlines & Cancellation
+class DeadlineExceeded(requests.exceptions.Timeout):
+    """The end-to-end deadline of a call ran out"""
+
+
+class RequestCancelled(requests.exceptions.RequestException):
+    """The call was cancelled by the user (or the script run waiting on it ended)"""
+
+
+class Deadline:
+    """End-to-end time budget for one API call, shared by the script thread and the worker sending it"""
+
+    def __init__(self, budget: float, cancel_event: Optional[threading.Event] = None):
+        self.budget = budget
+        self.expires_at = time.monotonic() + budget
+        # Batches share one event so a single cancel stops every call in them
+        self.cancel_event = cancel_event or threading.Event()
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def check(self):
+        if self.cancelled:
+            raise RequestCancelled("Request cancelled")
+        if self.expired:
+            raise DeadlineExceeded(f"Deadline of {self.budget:g}s exceeded")
+
+    def timeout(self) -> Timeout:
+        """urllib3 timeout whose total caps connect + upload + waiting for the response headers"""
+        self.check()
+        return Timeout(total=max(self.remaining(), 0.001))
+
+
+def get_endpoint_deadline(endpoint: str) -> float:
+    return st.session_state.endpoint_deadlines.get(endpoint, ENDPOINT_DEADLINES.get(endpoint, DEFAULT_REQUEST_DEADLINE))
+
+def iter_body(response: requests.Response, deadline: Deadline) -> Iterator[bytes]:
+    """Yield response body bytes as they arrive, checking the deadline between reads.
+
+    read1 returns whatever is available instead of waiting for a full chunk, so a
+    backend trickling bytes can't keep the call alive past its deadline.
+    """
+    while True:
+        deadline.check()
+        try:
+            chunk = response.raw.read1(STREAM_CHUNK_SIZE, decode_content=True)
+        except ReadTimeoutError as e:
+            raise DeadlineExceeded(f"Deadline of {deadline.budget:g}s exceeded") from e
+        except Urllib3Error as e:
+            raise requests.exceptions.ConnectionError(e) from e
+        if not chunk:
+            return
+        yield chunk
+
+def read_error_body(response: requests.Response, deadline: Deadline) -> str:
+    """Read the body of an HTTP error response under the call's deadline, up to ERROR_BODY_MAX_BYTES"""
+    body = bytearray()
+    for chunk in iter_body(response, deadline):
+        body += chunk
+        if len(body) >= ERROR_BODY_MAX_BYTES:
+            break
+    return bytes(body[:ERROR_BODY_MAX_BYTES]).decode(response.encoding or "utf-8", errors="replace")
+
+def wait_for_requests(futures: List[Future], label: str, cancel_event: threading.Event,
+                      records: Optional[queue.Queue] = None,
+                      on_record: Optional[Callable[[Any], None]] = None) -> Iterator[Future]:
+    """Wait for in-flight requests on the script thread, yielding each future as it finishes.
+
+    Streamlit only interrupts a script between element calls, so this polls and refreshes a
+    progress line instead of blocking. Clicking Cancel (or Stop) reruns the script, which
+    raises out of the wait and cancels every call still running. Streamed records queued by
+    the workers are handed to on_record here, on the script thread.
+    """
+    pending = set(futures)
+    wait_start = time.monotonic()
+    status = st.empty()
+    with status.container():
+        progress = st.empty()
+        st.button("⏹️ Cancel", key=f"cancel_{uuid.uuid4().hex}", help="Abort the running request(s)")
+    try:
+        while pending:
+            done, pending = wait(pending, timeout=DEADLINE_POLL_INTERVAL, return_when=FIRST_COMPLETED)
+            while records is not None and not records.empty():
+                on_record(records.get_nowait())
+            yield from done
+            if pending:
+                progress.caption(f"⏳ {label} · {time.monotonic() - wait_start:.1f}s elapsed")
+    finally:
+        # No-op for calls that already finished; aborts the rest
+        cancel_event.set()
+    status.empty()
+
 # Helper Functions
-def make_api_request(endpoint: str, method: str = "POST", files: Any = None, data: Dict = None, headers: Dict = None) -> Dict:
-    """Make API request with error handling and logging"""
-    url = f"{st.session_state.api_base_url}{endpoint}"
+def _stream_format(content_type: str) -> Optional[str]:
+    content_type = content_type.lower()
+    if "text/event-stream" in content_type:
+        return "sse"
+    if any(marker in content_type for marker in ("ndjson", "jsonl", "json-seq")):
+        return "ndjson"
+    return None
+
+def _iter_sse_data(lines: Iterator[str]) -> Iterator[str]:
+    """Yield the data payload of each server-sent event"""
+    data_lines = []
+    for line in lines:
+        if not line:
+            if data_lines:
+                yield "\n".join(data_lines)
+                data_lines = []
+            continue
+        if line.startswith(":"):
+            continue
+        field, _, value = line.partition(":")
+        if field == "data":
+            data_lines.append(value[1:] if value.startswith(" ") else value)
+    if data_lines:
+        yield "\n".join(data_lines)
+
+def _iter_lines(chunks: Iterator[bytes]) -> Iterator[str]:
+    # Invalid UTF-8 is replaced; a record it breaks is skipped as unparseable below
+    pending = b""
+    for chunk in chunks:
+        *lines, pending = (pending + chunk).split(b"\n")
+        for line in lines:
+            yield line.rstrip(b"\r").decode("utf-8", errors="replace")
+    if pending:
+        yield pending.rstrip(b"\r").decode("utf-8", errors="replace")
+
+def _iter_stream_records(response: requests.Response, stream_format: str, decode_timer: Dict,
+                         deadline: Deadline) -> Iterator[Any]:
+    """Parse a chunked NDJSON or SSE body into JSON records as the chunks arrive"""
+    lines = _iter_lines(iter_body(response, deadline))
+    payloads = _iter_sse_data(lines) if stream_format == "sse" else lines
+
+    for payload in payloads:
+        payload = payload.strip().lstrip("\x1e")  # json-seq record separator
+        if not payload or payload == "[DONE]":
+            continue
+        decode_start = time.perf_counter()
+        try:
+            record = json_loads(payload)
+        except ValueError:
+            logger.warning(f"Skipping unparseable streamed record: {payload[:200]}")
+            continue
+        finally:
+            decode_timer["seconds"] += time.perf_counter() - decode_start
+        yield record
+
+def send_api_request(base_url: str, api_key: str, endpoint: str, method: str = "POST", files: Any = None,
+                     data: Dict = None, headers: Dict = None, breaker: Optional[CircuitBreaker] = None,
+                     on_record: Optional[Callable[[Any], None]] = None,
+                     deadline: Optional[Deadline] = None,
+                     json_cache: Optional[DecodedJsonCache] = None) -> Tuple[Dict, Dict]:
+    """Send an API request without touching session state (safe to call from worker threads).
+
+    Returns the response dict and the request history entry for the caller to record.
+    Streamed (NDJSON/SSE) responses are parsed incrementally and each record is passed
+    to on_record as it arrives; buffered responses are handled as before.
+    The whole call (connect, upload and reading the body) is bounded by the deadline,
+    which defaults to the endpoint's configured budget. Nested JSON results are decoded
+    into json_cache (the session's cache) when one is given.
+    """
+    url = f"{base_url}{endpoint}"
+    if deadline is None:
+        deadline = Deadline(ENDPOINT_DEADLINES.get(endpoint, DEFAULT_REQUEST_DEADLINE))
 
     logger.info(f"Making API request: {method} {endpoint}")
     logger.debug(f"Full URL: {url}")
@@ -170,32 +1322,112 @@ def make_api_request(endpoint: str, method: str = "POST", files: Any = None, dat
         headers = {}
 
     # Add API key to headers
-    headers["X-API-Key"] = st.session_state.api_key
-    logger.debug(f"API Key present: {'Yes' if st.session_state.api_key else 'No'}")
+    headers["X-API-Key"] = api_key
+    logger.debug(f"API Key present: {'Yes' if api_key else 'No'}")
+
+    # Ask for a streamed response when the caller can render records progressively
+    stream = on_record is not None
+    if stream:
+        headers.setdefault("Accept", STREAM_ACCEPT_HEADER)
+
+    # Fail fast while the backend is known to be unhealthy
+    if breaker is not None and not breaker.allow_request():
+        error_message = f"Circuit open for {endpoint}: {breaker.last_reason or 'backend unhealthy'}"
+        logger.warning(f"⛔ Request short-circuited: {endpoint}")
 
+        log_entry = {
+            "timestamp": datetime.now().isoformat(),
+            "endpoint": endpoint,
+            "method": method,
+            "status_code": None,
+            "response_time": 0.0,
+            "error": error_message,
+            "circuit_open": True,
+            "outcome": "circuit_open",
+            "deadline": deadline.budget,
+            "success": False
+        }
+        return {
+            "success": False,
+            "error": error_message,
+            "status_code": None,
+            "response": None
+        }, log_entry
+
+    start_time = datetime.now()
+    response = None
     try:
-        start_time = datetime.now()
+        # Tell the backend how long we will wait; it can drop work that would finish too late
+        headers[DEADLINE_HEADER] = str(int(deadline.remaining() * 1000))
+        timeout = deadline.timeout()
 
+        # Bodies are always read incrementally so the deadline is checked between chunks
         if method == "POST":
             # Handle both dict and list formats for files
             if isinstance(files, list):
                 logger.debug(f"Sending {len(files)} files as list")
-                response = requests.post(url, files=files, data=data, headers=headers)
+                response = requests.post(url, files=files, data=data, headers=headers, stream=True, timeout=timeout)
             else:
                 logger.debug(f"Sending files as dict: {list(files.keys()) if files else 'None'}")
-                response = requests.post(url, files=files, data=data, headers=headers)
+                response = requests.post(url, files=files, data=data, headers=headers, stream=True, timeout=timeout)
         elif method == "GET":
             logger.debug(f"GET request with params: {data}")
-            response = requests.get(url, params=data, headers=headers)
+            response = requests.get(url, params=data, headers=headers, stream=True, timeout=timeout)
         else:
             logger.debug(f"Custom method {method}")
-            response = requests.request(method, url, files=files, data=data, headers=headers)
+            response = requests.request(method, url, files=files, data=data, headers=headers, stream=True, timeout=timeout)
 
+        deadline.check()
         response.raise_for_status()
+
+        content_type = response.headers.get('content-type', '')
+        stream_format = _stream_format(content_type)
+        records = []
+        time_to_first_result = None
+        decode_timer = {"seconds": 0.0}
+        if stream_format:
+            for record in _iter_stream_records(response, stream_format, decode_timer, deadline):
+                if time_to_first_result is None:
+                    time_to_first_result = (datetime.now() - start_time).total_seconds()
+                    logger.info(f"First streamed record from {endpoint} after {time_to_first_result:.2f}s")
+                records.append(record)
+                if on_record is not None:
+                    on_record(record)
+        else:
+            # Server did not stream: read the whole body so timings include it
+            body = b"".join(iter_body(response, deadline))
+            logger.debug(f"Buffered response body: {len(body)} bytes")
+
         elapsed_time = (datetime.now() - start_time).total_seconds()
+        if time_to_first_result is None:
+            time_to_first_result = elapsed_time
 
         logger.info(f"✅ Request successful: {endpoint} - Status: {response.status_code} - Time: {elapsed_time:.2f}s")
 
+        # Check if response is binary (image)
+        is_binary = not stream_format and 'image/' in content_type
+        if stream_format:
+            logger.info(f"Received {len(records)} streamed {stream_format} records")
+            response_data = records
+        elif is_binary:
+            logger.info(f"Received binary image response: {content_type}")
+            response_data = body
+        else:
+            # Try to parse as JSON
+            decode_start = time.perf_counter()
+            try:
+                response_data = json_loads(body) if body else {}
+                logger.debug(f"Parsed JSON response with keys: {list(response_data.keys()) if isinstance(response_data, dict) else 'list'}")
+            except ValueError:
+                logger.warning("Response is not valid JSON, treating as text")
+                response_data = body.decode(response.encoding or "utf-8", errors="replace")
+            decode_timer["seconds"] += time.perf_counter() - decode_start
+
+        # Decode nested JSON payloads once, up front; the tab's render hits the session cache
+        if not is_binary and json_cache is not None:
+            decode_timer["seconds"] += predecode_nested_json(endpoint, response_data, json_cache)
+        decode_time = decode_timer["seconds"]
+
         # Log to history
         log_entry = {
             "timestamp": datetime.now().isoformat(),
@@ -203,71 +1435,224 @@ def make_api_request(endpoint: str, method: str = "POST", files: Any = None, dat
             "method": method,
             "status_code": response.status_code,
             "response_time": elapsed_time,
+            "time_to_first_result": time_to_first_result,
+            "decode_time": decode_time,
+            "streamed": bool(stream_format),
+            "outcome": "success",
+            "deadline": deadline.budget,
             "success": True
         }
-        st.session_state.request_history.append(log_entry)
 
-        # Check if response is binary (image)
-        content_type = response.headers.get('content-type', '')
-        if 'image/' in content_type:
-            logger.info(f"Received binary image response: {content_type}")
-            return {
-                "success": True,
-                "data": response.content,
-                "is_binary": True,
-                "content_type": content_type,
-                "status_code": response.status_code,
-                "response_time": elapsed_time
-            }
-        else:
-            # Try to parse as JSON
-            try:
-                response_data = response.json() if response.content else {}
-                logger.debug(f"Parsed JSON response with keys: {list(response_data.keys()) if isinstance(response_data, dict) else 'list'}")
-            except json.JSONDecodeError:
-                logger.warning("Response is not valid JSON, treating as text")
-                response_data = response.text if response.content else ""
+        result = {
+            "success": True,
+            "data": response_data,
+            "is_binary": is_binary,
+            "status_code": response.status_code,
+            "response_time": elapsed_time,
+            "decode_time": decode_time
+        }
+        if stream_format:
+            result["streamed"] = True
+            result["time_to_first_result"] = time_to_first_result
+        if is_binary:
+            result["content_type"] = content_type
 
-            return {
-                "success": True,
-                "data": response_data,
-                "is_binary": False,
-                "status_code": response.status_code,
-                "response_time": elapsed_time
-            }
+        if breaker is not None:
+            breaker.record_success()
+        return result, log_entry
 
     except requests.exceptions.RequestException as e:
-        elapsed_time = (datetime.now() - start_time).total_seconds()
         status_code = getattr(e.response, 'status_code', None)
-        error_message = str(e)
+        # With stream=True the error body is still on the wire: read it under the same deadline
+        failure = e
+        error_body = None
+        if isinstance(e, requests.exceptions.HTTPError) and e.response is not None:
+            try:
+                error_body = read_error_body(e.response, deadline)
+            except requests.exceptions.RequestException as read_error:
+                failure = read_error
 
-        logger.error(f"❌ Request failed: {endpoint} - Status: {status_code} - Error: {error_message}")
-        logger.error(f"Response time before failure: {elapsed_time:.2f}s")
+        elapsed_time = (datetime.now() - start_time).total_seconds()
+        if isinstance(failure, RequestCancelled):
+            outcome = "cancelled"
+            error_message = f"Cancelled after {elapsed_time:.1f}s"
+        elif isinstance(failure, requests.exceptions.Timeout) or deadline.expired:
+            outcome = "timeout"
+            error_message = f"Timed out after {elapsed_time:.1f}s (deadline {deadline.budget:g}s)"
+        else:
+            outcome = "error"
+            error_message = str(e)
 
-        if hasattr(e.response, 'text'):
-            logger.error(f"Error response body: {e.response.text[:500]}")
+        if outcome == "cancelled":
+            logger.warning(f"⏹️ Request cancelled: {endpoint} after {elapsed_time:.2f}s")
+        else:
+            logger.error(f"❌ Request failed: {endpoint} - Status: {status_code} - Error: {error_message}")
+            logger.error(f"Response time before failure: {elapsed_time:.2f}s")
+
+        if error_body is not None:
+            logger.error(f"Error response body: {error_body[:500]}")
+
+        # Only connection problems, timeouts and server errors count against the breaker
+        if breaker is not None:
+            if outcome == "cancelled":
+                breaker.record_cancelled()
+            elif status_code is None or status_code >= 500:
+                breaker.record_failure(error_message)
+            else:
+                breaker.record_success()
 
         log_entry = {
             "timestamp": datetime.now().isoformat(),
             "endpoint": endpoint,
             "method": method,
             "status_code": status_code,
+            "response_time": elapsed_time,
             "error": error_message,
+            "outcome": outcome,
+            "deadline": deadline.budget,
             "success": False
         }
-        st.session_state.request_history.append(log_entry)
+        return {
+            "success": False,
+            "error": error_message,
+            "outcome": outcome,
+            "status_code": status_code,
+            "response": error_body
+        }, log_entry
+    except Exception as e:
+        # Anything else (a malformed body, a bug) must still settle the breaker, or a half-open trial slot leaks
+        elapsed_time = (datetime.now() - start_time).total_seconds()
+        status_code = response.status_code if response is not None else None
+        error_message = f"Unexpected error: {e}"
+        logger.exception(f"❌ Request failed: {endpoint} - Status: {status_code} - Error: {error_message}")
+        if breaker is not None:
+            breaker.record_failure(error_message)
 
+        log_entry = {
+            "timestamp": datetime.now().isoformat(),
+            "endpoint": endpoint,
+            "method": method,
+            "status_code": status_code,
+            "response_time": elapsed_time,
+            "error": error_message,
+            "outcome": "error",
+            "deadline": deadline.budget,
+            "success": False
+        }
         return {
             "success": False,
             "error": error_message,
+            "outcome": "error",
             "status_code": status_code,
-            "response": getattr(e.response, 'text', None)
+            "response": None
+        }, log_entry
+    finally:
+        if response is not None:
+            response.close()
+
+def make_api_request(endpoint: str, method: str = "POST", files: Any = None, data: Dict = None, headers: Dict = None,
+                     on_record: Optional[Callable[[Any], None]] = None) -> Dict:
+    """Make API request with error handling and logging.
+
+    The request is sent from a worker thread under the endpoint's deadline while the script
+    thread waits, so a stalled backend never holds the script thread and the call can be cancelled.
+    """
+    # Manual health checks always go through, regardless of circuit state
+    breaker = get_circuit_breaker(endpoint) if endpoint != HEALTH_ENDPOINT else None
+    deadline = Deadline(get_endpoint_deadline(endpoint))
+    profile = claim_profile("call", f"API call {method} {endpoint}")
+    records = queue.Queue() if on_record is not None else None
+    json_cache = get_decoded_json_cache()
+    base_url = st.session_state.api_base_url
+    api_key = st.session_state.api_key
+
+    def send() -> Tuple[Dict, Dict]:
+        if profile is not None:
+            profile.start()
+        try:
+            return send_api_request(
+                base_url, api_key, endpoint, method=method, files=files, data=data, headers=headers,
+                breaker=breaker, on_record=records.put if records is not None else None, deadline=deadline,
+                json_cache=json_cache
+            )
+        finally:
+            if profile is not None:
+                profile.stop()
+
+    executor = ThreadPoolExecutor(max_workers=1)
+    future = executor.submit(send)
+    executor.shutdown(wait=False)
+    for _ in wait_for_requests([future], f"{method} {endpoint}", deadline.cancel_event, records, on_record):
+        pass
+    response, log_entry = future.result()
+    if profile is not None:
+        store_profile_result(profile.result)
+    st.session_state.request_history.append(log_entry)
+    capture_request(endpoint, method, files, data, response, log_entry)
+    return response
+
+def run_concurrent_requests(jobs: Dict[str, Dict], max_workers: int) -> Iterator[Tuple[str, Dict]]:
+    """Run independent API requests on a bounded thread pool, yielding (job key, response) as each finishes.
+
+    Each job is a dict of make_api_request keyword arguments (endpoint, files, data, ...).
+    Request history is recorded from the script thread as results arrive.
+    """
+    base_url = st.session_state.api_base_url
+    api_key = st.session_state.api_key
+    cancel_event = threading.Event()
+    json_cache = get_decoded_json_cache()
+    # An armed "next API call" profile covers the first call of the batch
+    first_key = next(iter(jobs), None)
+    profile = None
+    if first_key is not None:
+        first_job = jobs[first_key]
+        profile = claim_profile("call", f"API call {first_job.get('method', 'POST')} {first_job['endpoint']} (1 of {len(jobs)} in batch)")
+
+    def send(job: Dict, budget: float, breaker: CircuitBreaker, profile: Optional[ProfileSession]) -> Tuple[Dict, Dict]:
+        # The deadline starts when a worker picks the job up, not while it waits in the queue
+        deadline = Deadline(budget, cancel_event)
+        if profile is not None:
+            profile.start()
+        try:
+            return send_api_request(base_url, api_key, breaker=breaker, deadline=deadline, json_cache=json_cache, **job)
+        finally:
+            if profile is not None:
+                profile.stop()
+
+    executor = ThreadPoolExecutor(max_workers=max(1, max_workers))
+    try:
+        futures = {
+            executor.submit(send, job, get_endpoint_deadline(job["endpoint"]), get_circuit_breaker(job["endpoint"]),
+                            profile if key == first_key else None): key
+            for key, job in jobs.items()
         }
+        for future in wait_for_requests(list(futures), f"{len(jobs)} requests", cancel_event):
+            response, log_entry = future.result()
+            if profile is not None and futures[future] == first_key:
+                store_profile_result(profile.result)
+            st.session_state.request_history.append(log_entry)
+            job = jobs[futures[future]]
+            capture_request(job["endpoint"], job.get("method", "POST"), job.get("files"), job.get("data"), response, log_entry)
+            yield futures[future], response
+    finally:
+        # Don't block the script on cancelled calls; queued ones never start
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def format_timings(response: Dict) -> str:
+    """Status and per-request timings for success messages"""
+    if response.get("status_code") == "cached":
+        return "♻️ reused an earlier result for a duplicate image, no request sent"
+    parts = [f"Status: {response['status_code']}", f"Time: {response['response_time']:.2f}s"]
+    if response.get("streamed"):
+        parts.append(f"First result: {response['time_to_first_result']:.2f}s")
+    if response.get("decode_time") is not None:
+        parts.append(f"Decode: {response['decode_time'] * 1000:.1f} ms")
+    return ", ".join(parts)
 
 def display_response(response: Dict):
     """Display API response in a formatted way"""
     if response["success"]:
-        st.success(f"✅ Request successful (Status: {response['status_code']}, Time: {response['response_time']:.2f}s)")
+        st.success(f"✅ Request successful ({format_timings(response)})")
 
         with st.expander("📊 Response Data", expanded=True):
             if isinstance(response["data"], dict):
@@ -282,6 +1667,70 @@ def display_response(response: Dict):
             with st.expander("Error Details"):
                 st.text(response['response'])
 
+def render_resolve_result(idx: int, result: Dict):
+    """Render one file's Tags Resolve Multi result"""
+    with st.expander(f"📄 {result.get('filename', f'File {idx}')}"):
+        if result.get('error'):
+            st.error(f"Error: {result['error']}")
+            logger.error(f"Error in result {idx}: {result['error']}")
+        else:
+            st.write(f"**Image Source:** {result.get('image_source', 'none')}")
+            st.write("**Result:**")
+            decoded, result_json = decode_nested_json(result.get('result', '{}'), get_decoded_json_cache())
+            if decoded:
+                st.json(result_json)
+            else:
+                st.text(result.get('result', 'No result'))
+
+def render_translation(filename: str, lang: str, content: str):
+    """Render a preview of one file's translation into one language"""
+    st.write(f"**{lang}:**")
+    if content.startswith("Error"):
+        st.error(content)
+        logger.error(f"Translation error for {filename} in {lang}: {content}")
+    else:
+        try:
+            for node in preview_json_array(content, TRANSLATION_PREVIEW_NODES):
+                st.write(f"  - {node.get('text', 'N/A')[:100]}...")
+        except (ValueError, AttributeError, TypeError):
+            st.text(content[:500] + "..." if len(content) > 500 else content)
+
+def translation_entries(record: Any) -> List[Tuple[str, Any]]:
+    """Normalize a streamed /v1/translate/multi record to (filename, translations) pairs.
+
+    Accepts per-file records ({"filename", "translations"}), per-language records
+    ({"filename", "language", "content"}) and partial buffered-style dicts ({filename: {...}}).
+    """
+    if not isinstance(record, dict):
+        return []
+
+    filename = record.get("filename")
+    if filename is None:
+        return list(record.items())
+
+    if isinstance(record.get("translations"), dict):
+        return [(filename, record["translations"])]
+
+    language = record.get("language")
+    if language is None:
+        return [(filename, f"Error: {record.get('error', 'Unexpected streamed record')}")]
+
+    if record.get("error"):
+        return [(filename, {language: f"Error: {record['error']}"})]
+    content = next((record[key] for key in ("content", "translated_json", "translation") if key in record), "")
+    return [(filename, {language: content if isinstance(content, str) else json.dumps(content)})]
+
+def merge_translation_records(records: List[Any]) -> Dict:
+    """Rebuild the buffered {filename: {language: content}} shape from streamed records"""
+    merged = {}
+    for record in records:
+        for filename, translations in translation_entries(record):
+            if isinstance(translations, dict) and isinstance(merged.get(filename), dict):
+                merged[filename].update(translations)
+            else:
+                merged[filename] = translations
+    return merged
+
 def create_sample_json():
     """Create a sample DOMX JSON for testing"""
     logger.info("Generated sample DOMX JSON")
@@ -305,6 +1754,759 @@ def create_sample_json():
         }
     }
 
+def render_locale_result(locale: str, response: Dict):
+    """Render one gallery cell of a multi-locale localization run"""
+    st.markdown(f"**{locale}**")
+
+    if not response["success"]:
+        st.error(f"❌ {response.get('error', 'Unknown error')}")
+        return
+
+    if response.get("is_binary", False):
+        st.image(response["data"], caption=locale, use_column_width=True)
+        st.download_button(
+            "📥 Download",
+            data=response["data"],
+            file_name=f"localized_{locale.replace(' ', '_').lower()}.png",
+            mime=response.get("content_type", "image/png"),
+            key=f"download_localized_{locale}"
+        )
+    elif isinstance(response["data"], dict):
+        analysis = response["data"].get("analysis", {})
+        st.metric("Suitability Score", f"{analysis.get('overallSuitabilityScore', 'N/A')}/10")
+        st.caption(f"{len(analysis.get('problematicElements', []))} problematic elements")
+        if "suggestions" in response["data"]:
+            with st.expander("💡 Suggestions"):
+                st.write(response["data"]["suggestions"])
+        if response["data"].get("generated_image_available") is False:
+            st.warning(f"⚠️ {response['data'].get('generation_error', 'Image generation failed')}")
+    else:
+        st.text(str(response["data"])[:500])
+
+    if response.get("status_code") == "cached":
+        st.caption("♻️ Reused from duplicate image")
+    else:
+        st.caption(f"⏱️ {response['response_time']:.2f}s")
+
+@st.fragment(run_every=HEALTH_PROBE_INTERVAL)
+def render_health_status():
+    """Show background health probe results and circuit breaker states"""
+    prober = get_health_prober(st.session_state.api_base_url, st.session_state.api_key)
+    prober.ensure_running()
+    stats = prober.stats()
+
+    if not stats["samples"]:
+        st.info("⏳ Waiting for first health probe...")
+    else:
+        if stats["healthy"]:
+            st.success(f"✅ Healthy ({stats['last_latency'] * 1000:.0f} ms)")
+        else:
+            st.error(f"❌ Unhealthy: {stats['last_error']}")
+
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric("Availability", f"{stats['availability']:.0f}%")
+        with col2:
+            avg_latency = stats["avg_latency"]
+            st.metric("Avg Latency", f"{avg_latency * 1000:.0f} ms" if avg_latency is not None else "N/A")
+
+        st.caption(f"Last {stats['samples']} probes, every {HEALTH_PROBE_INTERVAL:.0f}s · last checked {stats['last_checked'][11:19]}")
+
+    breakers = get_breaker_registry(st.session_state.api_base_url).snapshot()
+    if breakers:
+        st.markdown("**Circuit Breakers**")
+        state_icons = {CircuitBreaker.CLOSED: "🟢", CircuitBreaker.HALF_OPEN: "🟡", CircuitBreaker.OPEN: "🔴"}
+        breaker_df = pd.DataFrame(breakers)
+        breaker_df["state"] = breaker_df["state"].map(lambda state: f"{state_icons[state]} {state}")
+        st.dataframe(breaker_df[["endpoint", "state", "failures"]], use_container_width=True, hide_index=True)
+
+# Image Deduplication
+def compute_image_hash(image_bytes: bytes) -> Optional[int]:
+    """64-bit difference hash (dHash); stable across re-encoding and resizing"""
+    try:
+        with Image.open(io.BytesIO(image_bytes)) as img:
+            img.draft("L", (64, 64))  # Let JPEG decode at reduced size
+            small = img.convert("L").resize((9, 8), Image.Resampling.LANCZOS)
+    except Exception as e:
+        logger.warning(f"Could not hash image: {e}")
+        return None
+
+    pixels = small.tobytes()
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            value = (value << 1) | (pixels[row * 9 + col] > pixels[row * 9 + col + 1])
+    return value
+
+def hamming_distance(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+def content_key(*parts: Any) -> str:
+    """Exact-match key for the non-image inputs of a request (JSON bytes, form fields)"""
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, dict):
+            part = json.dumps(part, sort_keys=True, default=str)
+        digest.update(part if isinstance(part, bytes) else str(part).encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+def _is_duplicate(context_a: str, hash_a: Optional[int], context_b: str, hash_b: Optional[int], max_distance: int) -> bool:
+    if context_a != context_b or hash_a is None or hash_b is None:
+        return False
+    return hamming_distance(hash_a, hash_b) <= max_distance
+
+
+class DedupCache:
+    """Per-session results of earlier requests, looked up by context key and image hash.
+
+    Results are kept pickled: the cache doesn't keep test_results objects alive after the
+    ResultStore spills or evicts them, and its size is the bytes it actually holds.
+    """
+
+    def __init__(self, max_entries: int = DEDUP_CACHE_SIZE, max_bytes: float = DEDUP_CACHE_MB * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.entries = deque()
+        self._lock = threading.RLock()
+
+    def lookup(self, endpoint: str, context: str, image_hash: Optional[int], max_distance: int) -> Optional[Any]:
+        with self._lock:
+            blob = next((entry["result"] for entry in reversed(self.entries)
+                         if entry["endpoint"] == endpoint and _is_duplicate(context, image_hash, entry["context"], entry["image_hash"], max_distance)), None)
+        return pickle.loads(blob) if blob is not None else None
+
+    def store(self, endpoint: str, context: str, image_hash: Optional[int], result: Any):
+        if image_hash is None:
+            return
+        try:
+            blob = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError) as e:
+            logger.warning(f"Not caching {endpoint} result for deduplication: {e}")
+            return
+        if len(blob) > self.max_bytes:
+            return
+        with self._lock:
+            self.entries.append({"endpoint": endpoint, "context": context, "image_hash": image_hash, "result": blob})
+            self.nbytes += len(blob)
+            while len(self.entries) > self.max_entries:
+                self.nbytes -= len(self.entries.popleft()["result"])
+            self.shrink_to(self.max_bytes)
+
+    def shrink_to(self, limit: float) -> int:
+        """Drop the oldest results until the cache fits in limit bytes; returns bytes freed"""
+        freed = 0
+        with self._lock:
+            while self.entries and self.nbytes > limit:
+                size = len(self.entries.popleft()["result"])
+                self.nbytes -= size
+                freed += size
+        return freed
+
+
+def get_dedup_cache() -> DedupCache:
+    if 'dedup_cache' not in st.session_state:
+        st.session_state.dedup_cache = DedupCache()
+    return st.session_state.dedup_cache
+
+def dedup_enabled() -> bool:
+    return st.session_state.get("dedup_enabled", True)
+
+def plan_dedup(endpoint: str, contexts: List[str], images: List[Optional[bytes]]) -> Dict:
+    """Group near-duplicate (context, image) items and reuse results of earlier batches.
+
+    Returns a plan with, for every item, the index of its group representative ("groups"),
+    the representatives that still need a backend call ("to_send") and the cached results
+    of the others ("cached"), plus the uploads/bytes that will not be sent.
+    """
+    max_distance = st.session_state.get("dedup_max_distance", DEDUP_MAX_HAMMING_DISTANCE)
+    # The same bytes object (one image sent to every locale) is decoded and hashed only once
+    hashes_by_id = {}
+    for image in images:
+        if image and id(image) not in hashes_by_id:
+            hashes_by_id[id(image)] = compute_image_hash(image)
+    hashes = [hashes_by_id[id(image)] if image else None for image in images]
+
+    groups = []
+    representatives = []
+    for idx, (context, image_hash) in enumerate(zip(contexts, hashes)):
+        rep = next((r for r in representatives if _is_duplicate(context, image_hash, contexts[r], hashes[r], max_distance)), idx)
+        if rep == idx:
+            representatives.append(idx)
+        groups.append(rep)
+
+    cache = get_dedup_cache()
+    cached = {}
+    for rep in representatives:
+        result = cache.lookup(endpoint, contexts[rep], hashes[rep], max_distance)
+        if result is not None:
+            cached[rep] = result
+
+    to_send = [rep for rep in representatives if rep not in cached]
+    skipped = [idx for idx in range(len(images)) if idx not in to_send and images[idx]]
+
+    plan = {
+        "endpoint": endpoint,
+        "contexts": contexts,
+        "hashes": hashes,
+        "groups": groups,
+        "to_send": to_send,
+        "cached": cached,
+        "uploads_avoided": len(skipped),
+        "bytes_avoided": sum(len(images[idx]) for idx in skipped)
+    }
+    logger.info(f"Dedup plan for {endpoint}: {len(images)} items, {len(representatives)} unique, "
+                f"{len(cached)} cached, {len(to_send)} to send")
+    return plan
+
+def match_sent_results(send_indices: List[int], filenames: List[str], records: List[Any]) -> Dict[int, Any]:
+    """Pair returned records with the items that were sent.
+
+    Streamed records arrive in the order the server finishes them, so records carrying
+    a filename are matched by it; any others keep their position among the rest.
+    """
+    pending = {}
+    for idx in send_indices:
+        pending.setdefault(filenames[idx], deque()).append(idx)
+
+    matched = {}
+    unmatched = []
+    for record in records:
+        filename = record.get("filename") if isinstance(record, dict) else None
+        if pending.get(filename):
+            matched[pending[filename].popleft()] = record
+        else:
+            unmatched.append(record)
+    matched.update(zip((idx for idx in send_indices if idx not in matched), unmatched))
+    return matched
+
+def reused_response(response: Dict) -> Dict:
+    """A cached response as served again: the status and timings of the earlier call don't apply"""
+    reused = {key: value for key, value in response.items() if key not in ("time_to_first_result", "decode_time", "streamed")}
+    reused.update({"status_code": "cached", "response_time": 0.0})
+    return reused
+
+def store_dedup_results(plan: Dict, results: Dict[int, Any]):
+    """Remember results of representatives that were sent, keyed by their image hash"""
+    cache = get_dedup_cache()
+    for rep, result in results.items():
+        cache.store(plan["endpoint"], plan["contexts"][rep], plan["hashes"][rep], result)
+
+def record_dedup_savings(uploads: int, calls: int, bytes_saved: int):
+    stats = st.session_state.setdefault("dedup_stats", {"uploads_avoided": 0, "calls_avoided": 0, "bytes_avoided": 0})
+    stats["uploads_avoided"] += uploads
+    stats["calls_avoided"] += calls
+    stats["bytes_avoided"] += bytes_saved
+    if uploads or calls:
+        st.info(f"♻️ Deduplication avoided {uploads} image upload(s) ({bytes_saved / 1024:.1f} KB) and {calls} backend call(s)")
+        logger.info(f"Dedup savings: {uploads} uploads, {calls} calls, {bytes_saved} bytes")
+
+# Export Helpers
+def _image_extension(data: bytes) -> str:
+    """Guess a file extension for binary payloads (generated images)"""
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            return (img.format or "bin").lower()
+    except Exception:
+        return "bin"
+
+def _inline_binary(data: bytes) -> Dict:
+    return {"encoding": "base64", "size": len(data), "base64": base64.b64encode(data).decode("ascii")}
+
+def _exportable(value: Any, store_binary: Callable[[bytes], Dict]) -> Any:
+    """Replace binary payloads with JSON-safe references"""
+    if isinstance(value, (bytes, bytearray)):
+        return store_binary(bytes(value))
+    if isinstance(value, Mapping):
+        return {key: _exportable(item, store_binary) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_exportable(item, store_binary) for item in value]
+    return value
+
+def iter_result_records(test_results: Dict) -> Iterator[Dict]:
+    """Yield one export record per stored result (per file or locale for batch endpoints)"""
+    for test_name, results in test_results.items():
+        if isinstance(results, list):
+            for idx, result in enumerate(results):
+                yield {"type": "result", "test": test_name, "index": idx, "record": result}
+        elif test_name == "translate_multi" and isinstance(results, dict):
+            for idx, (filename, translations) in enumerate(results.items()):
+                yield {"type": "result", "test": test_name, "index": idx, "file": filename, "record": translations}
+        elif test_name == "localization_multi" and isinstance(results, dict):
+            for idx, (locale, response) in enumerate(results.items()):
+                yield {"type": "result", "test": test_name, "index": idx, "locale": locale, "record": response}
+        else:
+            yield {"type": "result", "test": test_name, "index": 0, "record": results}
+
+def iter_history_records(request_history: List[Dict]) -> Iterator[Dict]:
+    """Yield one export record per logged request"""
+    for entry in request_history:
+        yield {"type": "request", **entry}
+
+def write_ndjson(records: Iterator[Dict], out: IO[str], store_binary: Callable[[bytes], Dict] = _inline_binary) -> int:
+    """Write records as newline-delimited JSON, one record at a time"""
+    count = 0
+    for record in records:
+        out.write(json.dumps(_exportable(record, store_binary), default=str))
+        out.write("\n")
+        count += 1
+    return count
+
+def write_history_csv(request_history: List[Dict], out: IO[str]) -> int:
+    writer = csv.DictWriter(out, fieldnames=list(HISTORY_EXPORT_COLUMNS), extrasaction="ignore")
+    writer.writeheader()
+    count = 0
+    for entry in request_history:
+        writer.writerow(entry)
+        count += 1
+    return count
+
+def _spooled_export_file() -> IO[bytes]:
+    """Small exports stay in memory, large ones roll over to a temp file on disk"""
+    return tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_MAX_BYTES)
+
+def _write_text(buffer: IO[bytes], writer: Callable[[IO[str]], int]) -> int:
+    out = io.TextIOWrapper(buffer, encoding="utf-8", newline="")
+    count = writer(out)
+    out.flush()
+    out.detach()
+    return count
+
+def build_json_export(test_results: Dict, request_history: List[Dict]) -> IO[bytes]:
+    def write(out: IO[str]) -> int:
+        json.dump(_exportable(test_results, _inline_binary), out, indent=2, default=str)
+        return len(test_results)
+
+    buffer = _spooled_export_file()
+    _write_text(buffer, write)
+    buffer.seek(0)
+    return buffer
+
+def build_ndjson_export(test_results: Dict, request_history: List[Dict]) -> IO[bytes]:
+    def write(out: IO[str]) -> int:
+        return write_ndjson(iter_result_records(test_results), out) + write_ndjson(iter_history_records(request_history), out)
+
+    buffer = _spooled_export_file()
+    records = _write_text(buffer, write)
+    logger.info(f"Built NDJSON export with {records} records")
+    buffer.seek(0)
+    return buffer
+
+def build_history_csv_export(test_results: Dict, request_history: List[Dict]) -> IO[bytes]:
+    buffer = _spooled_export_file()
+    rows = _write_text(buffer, lambda out: write_history_csv(request_history, out))
+    logger.info(f"Built request history CSV export with {rows} rows")
+    buffer.seek(0)
+    return buffer
+
+def build_history_parquet_export(test_results: Dict, request_history: List[Dict]) -> IO[bytes]:
+    """Write request history timings to Parquet in fixed-size row batches"""
+    if pq is None:
+        raise RuntimeError("Parquet export requires pyarrow (pip install pyarrow)")
+
+    schema = pa.schema([(name, pa.type_for_alias(type_name)) for name, type_name in HISTORY_EXPORT_COLUMNS.items()])
+    buffer = _spooled_export_file()
+    with pq.ParquetWriter(buffer, schema) as writer:
+        for start in range(0, len(request_history), EXPORT_PARQUET_BATCH_SIZE):
+            batch = request_history[start:start + EXPORT_PARQUET_BATCH_SIZE]
+            rows = [{name: entry.get(name) for name in HISTORY_EXPORT_COLUMNS} for entry in batch]
+            writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+    logger.info(f"Built request history Parquet export with {len(request_history)} rows")
+    buffer.seek(0)
+    return buffer
+
+def build_zip_export(test_results: Dict, request_history: List[Dict]) -> IO[bytes]:
+    """ZIP bundle: results.ndjson, request_history.csv and generated images as separate files"""
+    buffer = _spooled_export_file()
+    image_count = 0
+
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as bundle:
+        def store_image(data: bytes) -> Dict:
+            nonlocal image_count
+            image_count += 1
+            path = f"images/image_{image_count:04d}.{_image_extension(data)}"
+            # Images are already compressed
+            bundle.writestr(path, data, compress_type=zipfile.ZIP_STORED)
+            return {"image_file": path, "size": len(data)}
+
+        # Images are written into the bundle while the NDJSON is spooled separately,
+        # since a ZIP archive can only have one entry open for writing at a time
+        def write_results(out: IO[str]) -> int:
+            return (write_ndjson(iter_result_records(test_results), out, store_binary=store_image)
+                    + write_ndjson(iter_history_records(request_history), out))
+
+        with _spooled_export_file() as results_file:
+            records = _write_text(results_file, write_results)
+            results_file.seek(0)
+            with bundle.open("results.ndjson", "w") as entry:
+                shutil.copyfileobj(results_file, entry)
+
+        with bundle.open("request_history.csv", "w") as entry:
+            _write_text(entry, lambda out: write_history_csv(request_history, out))
+
+    logger.info(f"Built ZIP export with {records} records and {image_count} images")
+    buffer.seek(0)
+    return buffer
+
+# Export format label -> (builder, file extension, mime type)
+EXPORT_FORMATS = {
+    "NDJSON (results + requests)": (build_ndjson_export, "ndjson", "application/x-ndjson"),
+    "ZIP bundle (results, history, images)": (build_zip_export, "zip", "application/zip"),
+    "Request history (CSV)": (build_history_csv_export, "csv", "text/csv"),
+    "JSON (single document)": (build_json_export, "json", "application/json")
+}
+# Parquet is only offered when the optional pyarrow dependency is importable
+if pq is not None:
+    EXPORT_FORMATS["Request history (Parquet)"] = (build_history_parquet_export, "parquet", "application/vnd.apache.parquet")
+
+# Record & Replay
+def _normalize_files(files: Any) -> List[Tuple[str, str, bytes, str]]:
+    """Flatten requests-style files (dict or list of tuples) to (field, filename, content, mime)"""
+    if not files:
+        return []
+    items = files.items() if isinstance(files, dict) else files
+    return [(field, payload[0], payload[1], payload[2] if len(payload) > 2 else "application/octet-stream")
+            for field, payload in items]
+
+
+class RequestRecorder:
+    """Captures API calls into a replay archive directory.
+
+    manifest.ndjson holds one entry per call (endpoint, form fields, payload file references,
+    response and timings); payload files and binary responses are stored once under payloads/
+    by SHA-256.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.payloads_dir = directory / "payloads"
+        self.payloads_dir.mkdir(parents=True, exist_ok=True)
+        self.manifest_path = directory / "manifest.ndjson"
+        self.started_at = time.time()
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def _store_payload(self, content: bytes) -> str:
+        sha256 = hashlib.sha256(content).hexdigest()
+        path = self.payloads_dir / sha256
+        if not path.exists():
+            path.write_bytes(content)
+        return sha256
+
+    def record(self, endpoint: str, method: str, files: Any, data: Optional[Dict], response: Dict, log_entry: Dict):
+        finished_at = datetime.fromisoformat(log_entry["timestamp"]).timestamp()
+        response_time = log_entry.get("response_time") or 0.0
+
+        entry = {
+            "offset": max(0.0, finished_at - response_time - self.started_at),
+            "timestamp": log_entry["timestamp"],
+            "endpoint": endpoint,
+            "method": method,
+            "data": data or {},
+            "files": [
+                {"field": field, "filename": filename, "mime": mime, "size": len(content), "sha256": self._store_payload(content)}
+                for field, filename, content, mime in _normalize_files(files)
+            ],
+            "response_time": response_time,
+            "status_code": response.get("status_code"),
+            "success": response["success"],
+            # Streamed responses are recorded as their list of records; replay asks for a stream too
+            "streamed": bool(response.get("streamed"))
+        }
+
+        if not response["success"]:
+            entry["error"] = response.get("error")
+        elif response.get("is_binary"):
+            entry["response_binary"] = {"sha256": self._store_payload(response["data"]), "content_type": response.get("content_type")}
+        else:
+            entry["response"] = response["data"]
+
+        with self._lock:
+            with open(self.manifest_path, "a", encoding="utf-8") as manifest:
+                manifest.write(json.dumps(entry, default=str) + "\n")
+            self.count += 1
+
+    def build_archive(self) -> IO[bytes]:
+        """ZIP the recording directory for download"""
+        buffer = _spooled_export_file()
+        with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            with self._lock:
+                if self.manifest_path.exists():
+                    archive.write(self.manifest_path, "manifest.ndjson")
+            for payload in sorted(self.payloads_dir.iterdir()):
+                archive.write(payload, f"payloads/{payload.name}")
+        buffer.seek(0)
+        return buffer
+
+
+class ReplayArchive:
+    """Recorded calls plus lazy access to their payload files"""
+
+    def __init__(self, entries: List[Dict], read_payload: Callable[[str], bytes]):
+        self.entries = entries
+        self.read_payload = read_payload
+
+    @staticmethod
+    def _parse_manifest(lines: Iterator[str]) -> List[Dict]:
+        return [json.loads(line) for line in lines if line.strip()]
+
+    @classmethod
+    def from_zip(cls, data: bytes) -> "ReplayArchive":
+        archive = zipfile.ZipFile(io.BytesIO(data))
+        entries = cls._parse_manifest(archive.read("manifest.ndjson").decode("utf-8").splitlines())
+        return cls(entries, lambda sha256: archive.read(f"payloads/{sha256}"))
+
+    @classmethod
+    def from_directory(cls, directory: Path) -> "ReplayArchive":
+        with open(directory / "manifest.ndjson", encoding="utf-8") as manifest:
+            entries = cls._parse_manifest(manifest)
+        return cls(entries, lambda sha256: (directory / "payloads" / sha256).read_bytes())
+
+
+def get_recorder() -> Optional[RequestRecorder]:
+    return st.session_state.get("recorder") if st.session_state.get("recording_enabled") else None
+
+def capture_request(endpoint: str, method: str, files: Any, data: Optional[Dict], response: Dict, log_entry: Dict):
+    """Add a finished call to the session's recording, if recording is on"""
+    recorder = get_recorder()
+    if recorder is None:
+        return
+    try:
+        recorder.record(endpoint, method, files, data, response, log_entry)
+    except OSError as e:
+        logger.error(f"Failed to record request {endpoint}: {e}")
+
+def _maybe_json(value: Any) -> Any:
+    """Nested results are often JSON strings; compare them structurally"""
+    if isinstance(value, str) and value[:1] in ("{", "["):
+        try:
+            return json.loads(value)
+        except json.JSONDecodeError:
+            pass
+    return value
+
+def diff_json(expected: Any, actual: Any, ignore_keys: frozenset = frozenset(), limit: int = REPLAY_MAX_DIFFS) -> List[str]:
+    """List paths where two parsed JSON documents differ (up to limit)"""
+    diffs = []
+
+    def short(value: Any) -> str:
+        text = json.dumps(value, default=str)
+        return text if len(text) <= 60 else text[:57] + "..."
+
+    def walk(a: Any, b: Any, path: str):
+        if len(diffs) >= limit:
+            return
+        a, b = _maybe_json(a), _maybe_json(b)
+        if isinstance(a, dict) and isinstance(b, dict):
+            for key in sorted(set(a) | set(b), key=str):
+                if key in ignore_keys:
+                    continue
+                if key not in b:
+                    diffs.append(f"{path}.{key}: missing in replay")
+                elif key not in a:
+                    diffs.append(f"{path}.{key}: new in replay")
+                else:
+                    walk(a[key], b[key], f"{path}.{key}")
+        elif isinstance(a, list) and isinstance(b, list):
+            if len(a) != len(b):
+                diffs.append(f"{path}: length {len(a)} -> {len(b)}")
+            for idx, (item_a, item_b) in enumerate(zip(a, b)):
+                walk(item_a, item_b, f"{path}[{idx}]")
+        elif a != b:
+            diffs.append(f"{path}: {short(a)} -> {short(b)}")
+
+    walk(expected, actual, "$")
+    return diffs
+
+def compare_replay(entry: Dict, response: Dict, ignore_keys: frozenset) -> List[str]:
+    if entry["success"] != response["success"] or entry.get("status_code") != response.get("status_code"):
+        return [f"status: {entry.get('status_code')} -> {response.get('status_code')} ({response.get('error', 'ok')})"]
+    if not response["success"]:
+        return []
+    if "response_binary" in entry:
+        if not response.get("is_binary"):
+            return ["response: binary -> JSON/text"]
+        if hashlib.sha256(response["data"]).hexdigest() != entry["response_binary"]["sha256"]:
+            return ["response: binary content differs"]
+        return []
+    if response.get("is_binary"):
+        return ["response: JSON/text -> binary"]
+    expected, actual = entry.get("response"), response["data"]
+    if entry.get("streamed") and isinstance(expected, list) and isinstance(actual, list):
+        # Streamed records arrive in completion order, which is not part of the response
+        expected, actual = (sorted(records, key=lambda record: json.dumps(record, sort_keys=True, default=str))
+                            for records in (expected, actual))
+    return diff_json(expected, actual, ignore_keys)
+
+def replay_archive(archive: ReplayArchive, base_url: str, api_key: str, keep_pacing: bool,
+                   max_workers: int, ignore_keys: frozenset, deadlines: Dict[str, float]) -> Iterator[Dict]:
+    """Re-issue recorded calls against base_url, yielding a comparison row as each finishes"""
+    replay_start = time.monotonic()
+    cancel_event = threading.Event()
+
+    def run(entry: Dict) -> Tuple[Dict, Dict]:
+        if keep_pacing:
+            delay = entry.get("offset", 0.0) - (time.monotonic() - replay_start)
+            if delay > 0:
+                cancel_event.wait(delay)
+        files = [(item["field"], (item["filename"], archive.read_payload(item["sha256"]), item["mime"]))
+                 for item in entry["files"]]
+        deadline = Deadline(deadlines.get(entry["endpoint"], DEFAULT_REQUEST_DEADLINE), cancel_event)
+        # Passing on_record sends the streaming Accept header the recorded call was made with
+        return send_api_request(base_url, api_key, entry["endpoint"], method=entry["method"],
+                                files=files or None, data=entry["data"] or None, deadline=deadline,
+                                on_record=(lambda record: None) if entry.get("streamed") else None)
+
+    executor = ThreadPoolExecutor(max_workers=max(1, max_workers))
+    try:
+        futures = {executor.submit(run, entry): idx for idx, entry in enumerate(archive.entries)}
+        for future in wait_for_requests(list(futures), f"Replaying {len(futures)} calls", cancel_event):
+            idx = futures[future]
+            entry = archive.entries[idx]
+            response, log_entry = future.result()
+            diffs = compare_replay(entry, response, ignore_keys)
+            yield {
+                "index": idx,
+                "endpoint": entry["endpoint"],
+                "recorded_time": entry.get("response_time") or 0.0,
+                "replay_time": log_entry.get("response_time") or 0.0,
+                "recorded_status": entry.get("status_code"),
+                "replay_status": response.get("status_code"),
+                "differences": len(diffs),
+                "diffs": diffs
+            }
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def summarize_replay(rows: List[Dict]) -> pd.DataFrame:
+    """Per-endpoint latency deltas and response difference counts"""
+    df = pd.DataFrame(rows)
+    summary = df.groupby("endpoint").agg(
+        calls=("index", "count"),
+        recorded_mean=("recorded_time", "mean"),
+        replay_mean=("replay_time", "mean"),
+        recorded_p50=("recorded_time", "median"),
+        replay_p50=("replay_time", "median"),
+        mismatched=("differences", lambda diffs: int((diffs > 0).sum()))
+    )
+    summary["delta_mean"] = summary["replay_mean"] - summary["recorded_mean"]
+    summary["delta_pct"] = (summary["delta_mean"] / summary["recorded_mean"].where(summary["recorded_mean"] > 0) * 100).round(1)
+    return summary.reset_index()
+
+# Synthetic Corpus Generator
+class CorpusFile(io.BytesIO):
+    """In-memory file with the same interface as Streamlit's UploadedFile (name, type, getvalue)"""
+
+    def __init__(self, name: str, data: bytes, mime_type: str):
+        super().__init__(data)
+        self.name = name
+        self.type = mime_type
+        self.size = len(data)
+
+
+def _text_length(rng: random.Random, distribution: str, mean_words: int, max_words: int) -> int:
+    if distribution == "Uniform":
+        length = rng.randint(1, max(1, 2 * mean_words - 1))
+    elif distribution == "Normal":
+        length = round(rng.gauss(mean_words, mean_words / 3))
+    else:  # Long tail: mostly short strings with occasional very long ones
+        length = round(rng.lognormvariate(0, 1) * mean_words / 1.65)
+    return min(max(1, length), max_words)
+
+def generate_domx_document(rng: random.Random, node_count: int, type_weights: Dict[str, float], distribution: str,
+                           mean_words: int, max_words: int, duplicate_ratio: float, text_pool: List[str]) -> Dict:
+    """Build one DOMX document; text_pool is shared across documents so duplicates span files"""
+    node_types = list(type_weights)
+    weights = [type_weights[node_type] for node_type in node_types]
+
+    nodes = {}
+    for idx in range(1, node_count + 1):
+        if text_pool and rng.random() < duplicate_ratio:
+            text = rng.choice(text_pool)
+        else:
+            words = rng.choices(CORPUS_VOCABULARY, k=_text_length(rng, distribution, mean_words, max_words))
+            text = " ".join(words).capitalize()
+            text_pool.append(text)
+
+        node_id = f"node{idx}"
+        nodes[node_id] = {"id": node_id, "text": text, "type": rng.choices(node_types, weights=weights)[0]}
+
+    return {"nodes": nodes}
+
+def generate_image(rng: random.Random, width: int, height: int, image_format: str, style: str) -> bytes:
+    """Deterministic test image; "Noise" is incompressible, for hitting large byte sizes"""
+    if style == "Noise":
+        img = Image.frombytes("RGB", (width, height), rng.randbytes(width * height * 3))
+    else:
+        img = Image.new("RGB", (width, height), tuple(rng.randrange(256) for _ in range(3)))
+        draw = ImageDraw.Draw(img)
+        for _ in range(rng.randint(5, 15)):
+            x0, y0 = rng.randrange(width), rng.randrange(height)
+            x1, y1 = x0 + rng.randrange(1, max(2, width // 2)), y0 + rng.randrange(1, max(2, height // 2))
+            color = tuple(rng.randrange(256) for _ in range(3))
+            if rng.random() < 0.5:
+                draw.rectangle([x0, y0, x1, y1], fill=color)
+            else:
+                draw.ellipse([x0, y0, x1, y1], fill=color)
+        draw.text((10, 10), " ".join(rng.choices(CORPUS_VOCABULARY, k=4)).title(), fill=(255, 255, 255))
+
+    buffer = io.BytesIO()
+    img.save(buffer, format=image_format)
+    return buffer.getvalue()
+
+def generate_corpus(params: Dict) -> Dict:
+    """Generate a seeded, deterministic corpus of DOMX JSON files and matching images"""
+    rng = random.Random(params["seed"])
+    text_pool = []
+    json_files = []
+    images = []
+    total_nodes = 0
+    extension, mime_type = CORPUS_IMAGE_FORMATS[params["image_format"]]
+
+    for idx in range(1, params["file_count"] + 1):
+        node_count = rng.randint(params["min_nodes"], params["max_nodes"])
+        total_nodes += node_count
+        document = generate_domx_document(
+            rng, node_count, params["type_weights"], params["text_distribution"],
+            params["mean_words"], params["max_words"], params["duplicate_ratio"], text_pool
+        )
+        json_files.append(CorpusFile(f"doc_{idx:04d}.json", json.dumps(document, indent=2).encode("utf-8"), "application/json"))
+
+        if params["generate_images"]:
+            image_bytes = generate_image(rng, params["image_width"], params["image_height"], params["image_format"], params["image_style"])
+            images.append(CorpusFile(f"doc_{idx:04d}.{extension}", image_bytes, mime_type))
+
+    logger.info(f"Generated corpus (seed {params['seed']}): {len(json_files)} files, {total_nodes} nodes, {len(images)} images")
+    return {"params": params, "json_files": json_files, "images": images, "total_nodes": total_nodes,
+            "unique_texts": len(text_pool)}
+
+def build_corpus_archive(corpus: Dict) -> IO[bytes]:
+    """ZIP of the corpus: domx/*.json, images/* and a manifest with the generation parameters"""
+    buffer = _spooled_export_file()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        manifest = {"params": corpus["params"], "files": []}
+        for folder, files in (("domx", corpus["json_files"]), ("images", corpus["images"])):
+            for corpus_file in files:
+                data = corpus_file.getvalue()
+                compression = zipfile.ZIP_STORED if folder == "images" else zipfile.ZIP_DEFLATED
+                archive.writestr(f"{folder}/{corpus_file.name}", data, compress_type=compression)
+                manifest["files"].append({"path": f"{folder}/{corpus_file.name}", "size": len(data),
+                                          "sha256": hashlib.sha256(data).hexdigest()})
+        archive.writestr("manifest.json", json.dumps(manifest, indent=2))
+    buffer.seek(0)
+    return buffer
+
+def corpus_input(key: str, label: str = "Use generated corpus") -> Optional[Dict]:
+    """Offer the session's generated corpus as input to a tab; returns it when selected"""
+    corpus = st.session_state.get("corpus")
+    if corpus is None:
+        return None
+    description = f"{len(corpus['json_files'])} JSON files, {len(corpus['images'])} images, seed {corpus['params']['seed']}"
+    if st.checkbox(f"{label} ({description})", key=f"use_corpus_{key}"):
+        return corpus
+    return None
+
 # Main Application
 st.title("🧪 AI Worker API Testing Suite")
 st.markdown("### FastAPI Backend Testing Interface")
@@ -333,6 +2535,22 @@ with st.sidebar:
         st.success("✅ Settings updated and saved!")
         st.rerun()
 
+    # Per-endpoint deadlines
+    with st.expander("⏱️ Request Deadlines"):
+        st.caption(f"End-to-end budget per call (connect, upload and response). The remaining budget is sent as `{DEADLINE_HEADER}`.")
+        for endpoint, default_budget in ENDPOINT_DEADLINES.items():
+            budget = st.number_input(
+                endpoint,
+                min_value=1.0,
+                max_value=3600.0,
+                value=float(st.session_state.endpoint_deadlines.get(endpoint, default_budget)),
+                step=5.0,
+                key=f"deadline_{endpoint}"
+            )
+            if budget != st.session_state.endpoint_deadlines.get(endpoint):
+                logger.info(f"Deadline for {endpoint} set to {budget:.0f}s")
+                st.session_state.endpoint_deadlines[endpoint] = budget
+
     st.divider()
 
     # Test Health
@@ -347,13 +2565,122 @@ with st.sidebar:
             st.error("❌ API is not responding")
             logger.warning("Health check failed")
 
+    render_health_status()
+
+    st.divider()
+
+    # Image Deduplication
+    st.header("♻️ Image Deduplication")
+    st.checkbox("Deduplicate images", value=True, key="dedup_enabled",
+                help="Group near-identical images (perceptual hash) so each is uploaded and analyzed once")
+    st.slider("Max Hamming distance", min_value=0, max_value=16, value=DEDUP_MAX_HAMMING_DISTANCE,
+              key="dedup_max_distance", disabled=not dedup_enabled(),
+              help="0 = identical images only; higher values also match resized or re-exported copies")
+
+    dedup_stats = st.session_state.get("dedup_stats")
+    if dedup_stats:
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric("Uploads Avoided", dedup_stats["uploads_avoided"])
+        with col2:
+            st.metric("Calls Avoided", dedup_stats["calls_avoided"])
+        st.caption(f"{dedup_stats['bytes_avoided'] / (1024 * 1024):.2f} MB of image uploads saved this session")
+
+    st.divider()
+
+    # Operator tools
+    if OPERATOR_TOKEN:
+        st.header("🔧 Operator")
+        if not is_operator():
+            operator_token = st.text_input("Operator Token", type="password", key="operator_token_input")
+            if st.button("Unlock", key="operator_unlock"):
+                if hmac.compare_digest(operator_token, OPERATOR_TOKEN):
+                    st.session_state.operator_mode = True
+                    logger.info("Operator mode enabled for session")
+                    st.rerun()
+                else:
+                    st.error("❌ Invalid operator token")
+                    logger.warning("Invalid operator token entered")
+        else:
+            profile_target = st.radio("Profile", ["Next script run", "Next API call"], key="profile_target",
+                                      help="cProfile + tracemalloc; nothing is instrumented until armed")
+            col1, col2 = st.columns(2)
+            with col1:
+                if st.button("Arm Profiler", key="arm_profiler"):
+                    st.session_state.profile_request = "script" if profile_target == "Next script run" else "call"
+                    logger.info(f"Profiler armed: {profile_target}")
+            with col2:
+                if st.button("Lock", key="operator_lock"):
+                    st.session_state.operator_mode = False
+                    st.session_state.profile_request = None
+                    st.rerun()
+
+            if st.session_state.get("profile_request"):
+                target = "script run" if st.session_state.profile_request == "script" else "API call"
+                st.info(f"⏺️ Profiler armed for the next {target}")
+            if st.session_state.get("profile_results"):
+                st.caption("Profile reports are shown at the bottom of the page")
+
+        st.divider()
+
+    # Recording
+    st.header("🎙️ Recording")
+    if st.toggle("Record requests", key="recording_enabled",
+                 help="Capture every API call (form fields, payload files, response, timings) into a replay archive"):
+        if st.session_state.get("recorder") is None:
+            recording_dir = RECORDINGS_DIR / f"recording_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.urandom(3).hex()}"
+            try:
+                st.session_state.recorder = RequestRecorder(recording_dir)
+            except OSError as e:
+                logger.error(f"Failed to start request recording in {recording_dir}: {e}")
+                st.error(f"❌ Cannot record to {RECORDINGS_DIR}: {e}")
+            else:
+                # Recordings hold raw payloads and responses: each session only gets to replay its own
+                st.session_state.setdefault("recording_dirs", []).append(recording_dir)
+                logger.info(f"Started request recording: {recording_dir}")
+
+    recorder = st.session_state.get("recorder")
+    if recorder is not None:
+        st.caption(f"{recorder.count} calls recorded in `{recorder.directory}`")
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("Prepare Archive", key="prepare_recording"):
+                with recorder.build_archive() as archive_file:
+                    st.session_state.recording_archive = archive_file.read()
+        with col2:
+            if st.button("New Recording", key="reset_recording"):
+                logger.info(f"Closed request recording: {recorder.directory}")
+                st.session_state.recorder = None
+                st.session_state.pop("recording_archive", None)
+                st.rerun()
+        if st.session_state.get("recording_archive"):
+            st.download_button(
+                "📥 Download Replay Archive",
+                data=st.session_state.recording_archive,
+                file_name=f"{recorder.directory.name}.zip",
+                mime="application/zip"
+            )
+
+    st.divider()
+
+    # Memory
+    st.header("💾 Memory")
+    memory_usage = memory_registry.usage(st.session_state.test_results.session_id)
+    memory_budget = SESSION_MEMORY_BUDGET_MB * 1024 * 1024
+    st.progress(min(1.0, memory_usage.get("total", 0) / memory_budget),
+                text=f"{memory_usage.get('total', 0) / (1024 * 1024):.1f} / {SESSION_MEMORY_BUDGET_MB:.0f} MB")
+    spilled_count = sum(1 for key in st.session_state.test_results if st.session_state.test_results.is_spilled(key))
+    st.caption(f"{len(st.session_state.test_results) - spilled_count} results in memory, {spilled_count} on disk, "
+               f"{len(st.session_state.test_results.evicted)} evicted")
+
     st.divider()
 
     # Request History
     st.header("📜 Request History")
     if st.session_state.request_history:
         df = pd.DataFrame(st.session_state.request_history)
-        st.dataframe(df[['timestamp', 'endpoint', 'success']], use_container_width=True)
+        history_columns = [column for column in ['timestamp', 'endpoint', 'success', 'outcome', 'response_time', 'time_to_first_result', 'decode_time'] if column in df.columns]
+        st.dataframe(df[history_columns], use_container_width=True)
 
         if st.button("Clear History"):
             logger.info("User cleared request history")
@@ -363,13 +2690,15 @@ with st.sidebar:
         st.info("No requests yet")
 
 # Main Content - Tabs for different endpoints
-tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
+tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8 = st.tabs([
     "📄 Tags Resolve Multi",
     "📤 Tags Resolve Upload",
     "🌍 Translate Single",
     "🌍 Translate Multi",
     "🖼️ Image Localization",
-    "📊 Test Results"
+    "📊 Test Results",
+    "🔁 Replay",
+    "🧬 Corpus Generator"
 ])
 
 # Tab 1: Tags Resolve Multi
@@ -411,22 +2740,50 @@ with tab1:
             placeholder="s3://bucket/image1.jpg, /path/to/image2.png"
         )
 
+    corpus = corpus_input("resolve_multi")
+    if corpus:
+        json_files = corpus["json_files"]
+        image_files = corpus["images"]
+
+    stream_resolve = st.checkbox(
+        "Stream results as they arrive",
+        value=True,
+        key="resolve_multi_stream",
+        help="Render each file's result as soon as the server streams it (falls back to the full response otherwise)"
+    )
+
     if st.button("🚀 Execute Tags Resolve Multi", type="primary", key="exec_resolve_multi"):
         if json_files:
             logger.info(f"User initiated Tags Resolve Multi with {len(json_files)} JSON files and {len(image_files)} images")
 
             with st.spinner("Processing..."):
+                json_payloads = [json_file.getvalue() for json_file in json_files]
+                image_payloads = [img_file.getvalue() for img_file in image_files]
+
+                # Images pair with JSON files by position, so duplicates can only be dropped
+                # when every JSON file has its own uploaded image
+                plan = None
+                if dedup_enabled() and image_files and len(image_files) == len(json_files) and not image_paths:
+                    plan = plan_dedup(
+                        "/v1/tags/resolve/multi",
+                        [content_key(payload) for payload in json_payloads],
+                        image_payloads
+                    )
+                send_indices = plan["to_send"] if plan else list(range(len(json_files)))
+
                 # Prepare files as list of tuples for multiple files with same field name
                 files_list = []
 
                 # Add JSON files
-                for json_file in json_files:
-                    files_list.append(('json_files', (json_file.name, json_file.getvalue(), 'application/json')))
-                    logger.debug(f"Added JSON file: {json_file.name}")
+                for idx in send_indices:
+                    files_list.append(('json_files', (json_files[idx].name, json_payloads[idx], 'application/json')))
+                    logger.debug(f"Added JSON file: {json_files[idx].name}")
 
                 # Add image files if any
-                for img_file in image_files:
-                    files_list.append(('images', (img_file.name, img_file.getvalue(), f'image/{img_file.type.split("/")[-1]}')))
+                image_indices = send_indices if plan else range(len(image_files))
+                for idx in image_indices:
+                    img_file = image_files[idx]
+                    files_list.append(('images', (img_file.name, image_payloads[idx], f'image/{img_file.type.split("/")[-1]}')))
                     logger.debug(f"Added image file: {img_file.name}")
 
                 # Prepare data dict
@@ -435,28 +2792,50 @@ with tab1:
                     data_dict['image_paths'] = image_paths
                     logger.debug(f"Image paths provided: {image_paths}")
 
-                response = make_api_request("/v1/tags/resolve/multi", files=files_list, data=data_dict)
+                # Show each file's result as soon as the server streams it
+                live_area = st.empty()
+                live_box = live_area.container()
+
+                live_records = []
+
+                def show_resolve_record(record: Any):
+                    if isinstance(record, dict):
+                        with live_box:
+                            render_resolve_result(len(live_records), record)
+                        live_records.append(record)
+
+                if send_indices:
+                    response = make_api_request(
+                        "/v1/tags/resolve/multi", files=files_list, data=data_dict,
+                        on_record=show_resolve_record if stream_resolve else None
+                    )
+                    live_area.empty()
+                else:
+                    logger.info("All Tags Resolve Multi items served from dedup cache")
+                    response = {"success": True, "data": [], "is_binary": False, "status_code": "cached", "response_time": 0.0}
+
+                # Fan results of unique images back out to every duplicate
+                if plan and response["success"] and isinstance(response["data"], list):
+                    sent_results = match_sent_results(send_indices, [json_file.name for json_file in json_files], response["data"])
+                    store_dedup_results(plan, {idx: result for idx, result in sent_results.items()
+                                               if isinstance(result, dict) and not result.get('error')})
+                    resolved = {**plan["cached"], **sent_results}
+                    response["data"] = [
+                        {**resolved[rep], "filename": json_files[idx].name} if rep in resolved else
+                        {"filename": json_files[idx].name, "error": "No result returned for duplicate group"}
+                        for idx, rep in enumerate(plan["groups"])
+                    ]
+                    record_dedup_savings(plan["uploads_avoided"], 0 if send_indices else 1, plan["bytes_avoided"])
 
                 # Display response
                 if response["success"]:
-                    st.success(f"✅ Request successful (Status: {response['status_code']}, Time: {response['response_time']:.2f}s)")
+                    st.success(f"✅ Request successful ({format_timings(response)})")
                     logger.info(f"Tags Resolve Multi completed successfully with {len(response['data'])} results")
 
                     # Display results for each file
                     st.subheader("Results")
                     for idx, result in enumerate(response["data"]):
-                        with st.expander(f"📄 {result.get('filename', f'File {idx}')}"):
-                            if result.get('error'):
-                                st.error(f"Error: {result['error']}")
-                                logger.error(f"Error in result {idx}: {result['error']}")
-                            else:
-                                st.write(f"**Image Source:** {result.get('image_source', 'none')}")
-                                st.write("**Result:**")
-                                try:
-                                    result_json = json.loads(result.get('result', '{}'))
-                                    st.json(result_json)
-                                except:
-                                    st.text(result.get('result', 'No result'))
+                        render_resolve_result(idx, result)
 
                     # Store results
                     st.session_state.test_results["resolve_multi"] = response["data"]
@@ -506,6 +2885,11 @@ with tab2:
         if image_file:
             st.image(image_file, caption="Uploaded Image", use_column_width=True)
 
+    corpus = corpus_input("resolve_upload", "Use first file of generated corpus")
+    if corpus:
+        json_file = corpus["json_files"][0]
+        image_file = corpus["images"][0] if corpus["images"] else None
+
     if st.button("🚀 Execute Tags Resolve Upload", type="primary", key="exec_resolve_upload"):
         if json_file:
             logger.info(f"User initiated Tags Resolve Upload with JSON: {json_file.name}")
@@ -520,7 +2904,18 @@ with tab2:
                 if image_file:
                     files_dict['image_file'] = (image_file.name, image_file.getvalue(), f'image/{image_file.type}')
 
-                response = make_api_request("/v1/tags/resolve/upload", files=files_dict)
+                plan = None
+                if dedup_enabled() and image_file:
+                    plan = plan_dedup("/v1/tags/resolve/upload", [content_key(files_dict['json_file'][1])], [files_dict['image_file'][1]])
+
+                if plan and plan["cached"]:
+                    logger.info("Tags Resolve Upload served from dedup cache")
+                    response = reused_response(plan["cached"][0])
+                    record_dedup_savings(plan["uploads_avoided"], 1, plan["bytes_avoided"])
+                else:
+                    response = make_api_request("/v1/tags/resolve/upload", files=files_dict)
+                    if plan and response["success"]:
+                        store_dedup_results(plan, {0: response})
                 display_response(response)
 
                 # Store results
@@ -566,6 +2961,10 @@ with tab3:
                 key="download_sample_translate"
             )
 
+    corpus = corpus_input("translate_single", "Use first file of generated corpus")
+    if corpus:
+        json_file = corpus["json_files"][0]
+
     if st.button("🚀 Execute Translation", type="primary", key="exec_translate_single"):
         if json_file:
             target_lang = custom_language or target_language
@@ -590,7 +2989,9 @@ with tab3:
 
                     st.subheader("Translated Nodes")
                     try:
-                        translated_nodes = json.loads(response["data"]["translated_json"])
+                        decoded, translated_nodes = decode_nested_json(response["data"]["translated_json"], get_decoded_json_cache())
+                        if not decoded:
+                            raise ValueError("translated_json is not valid JSON")
                         for node in translated_nodes:
                             st.write(f"**Node {node['id']}:** {node['text']}")
                     except:
@@ -629,6 +3030,17 @@ with tab4:
             key="translate_multi_json"
         )
 
+        corpus = corpus_input("translate_multi")
+        if corpus:
+            json_files = corpus["json_files"]
+
+        stream_translations = st.checkbox(
+            "Stream results as they arrive",
+            value=True,
+            key="translate_multi_stream",
+            help="Render each file/language as soon as the server streams it (falls back to the full response otherwise)"
+        )
+
     if st.button("🚀 Execute Multi Translation", type="primary", key="exec_translate_multi"):
         if json_files and (selected_languages or custom_languages):
             all_languages = selected_languages.copy()
@@ -648,7 +3060,28 @@ with tab4:
                     'languages': ','.join(all_languages)
                 }
 
-                response = make_api_request("/v1/translate/multi", files=files_list, data=data_dict)
+                # Show each file/language as soon as the server streams it
+                live_area = st.empty()
+                live_box = live_area.container()
+
+                def show_translation_record(record: Any):
+                    with live_box:
+                        for filename, translations in translation_entries(record):
+                            if isinstance(translations, dict):
+                                for lang, content in translations.items():
+                                    st.caption(f"📄 {filename}")
+                                    render_translation(filename, lang, content)
+                            else:
+                                st.error(f"{filename}: {translations}")
+
+                response = make_api_request(
+                    "/v1/translate/multi", files=files_list, data=data_dict,
+                    on_record=show_translation_record if stream_translations else None
+                )
+                live_area.empty()
+
+                if response["success"] and response.get("streamed"):
+                    response["data"] = merge_translation_records(response["data"])
                 display_response(response)
 
                 # Display results in a structured way
@@ -661,17 +3094,7 @@ with tab4:
                         with st.expander(f"📄 {filename}"):
                             if isinstance(translations, dict):
                                 for lang, content in translations.items():
-                                    st.write(f"**{lang}:**")
-                                    if content.startswith("Error"):
-                                        st.error(content)
-                                        logger.error(f"Translation error for {filename} in {lang}: {content}")
-                                    else:
-                                        try:
-                                            nodes = json.loads(content)
-                                            for node in nodes[:3]:
-                                                st.write(f"  - {node.get('text', 'N/A')[:100]}...")
-                                        except:
-                                            st.text(content[:500] + "..." if len(content) > 500 else content)
+                                    render_translation(filename, lang, content)
                             else:
                                 st.error(translations)
         else:
@@ -687,11 +3110,32 @@ with tab5:
 
     with col1:
         st.subheader("Localization Settings")
-        target_locale = st.text_input(
-            "Target Locale",
-            value="Japanese market",
-            placeholder="e.g., Japanese market, Spanish audience"
-        )
+        localization_mode = st.radio("Mode", ["Single locale", "Multiple locales"], horizontal=True, key="localization_mode")
+        multi_locale = localization_mode == "Multiple locales"
+
+        if multi_locale:
+            target_locales_text = st.text_area(
+                "Target Locales (one per line or comma-separated)",
+                value="Japanese market\nGerman market\nBrazilian Portuguese audience",
+                placeholder="Japanese market, German market, Spanish audience"
+            )
+            target_locales = list(dict.fromkeys(
+                locale.strip() for line in target_locales_text.splitlines() for locale in line.split(',') if locale.strip()
+            ))
+            target_locale = ", ".join(target_locales)
+            max_concurrency = st.slider(
+                "Max concurrent pipelines",
+                min_value=1,
+                max_value=8,
+                value=LOCALIZATION_MAX_CONCURRENCY,
+                key="localization_concurrency"
+            )
+        else:
+            target_locale = st.text_input(
+                "Target Locale",
+                value="Japanese market",
+                placeholder="e.g., Japanese market, Spanish audience"
+            )
 
         website_context = st.text_area(
             "Website Context",
@@ -721,6 +3165,9 @@ with tab5:
                 type=['png', 'jpg', 'jpeg', 'gif', 'bmp', 'webp'],
                 key="localize_image"
             )
+            corpus = corpus_input("localization", "Use first image of generated corpus")
+            if corpus and corpus["images"]:
+                original_image = corpus["images"][0]
             if original_image:
                 st.image(original_image, caption="Original Image", use_column_width=True)
 
@@ -736,7 +3183,94 @@ with tab5:
                 placeholder="/path/to/local/image.jpg"
             )
 
-    if st.button("🚀 Run Localization Pipeline", type="primary", key="exec_localization"):
+    run_localization = st.button("🚀 Run Localization Pipeline", type="primary", key="exec_localization")
+
+    if run_localization and multi_locale:
+        if (original_image or image_path) and target_locales and website_context:
+            logger.info(f"User initiated multi-locale localization: {len(target_locales)} locales, concurrency {max_concurrency}")
+            logger.info(f"Target locales: {', '.join(target_locales)}")
+
+            # Read the source image once and share the same payload across all locale requests;
+            # path sources reuse original_image_path so nothing is uploaded at all
+            base_data = {
+                'website_context': website_context.strip(),
+                'auto_generate': str(auto_generate).lower()
+            }
+            if image_path:
+                base_data['original_image_path'] = image_path
+            if auto_generate and custom_prompt and custom_prompt.strip():
+                base_data['custom_generation_prompt'] = custom_prompt
+
+            image_payload = None
+            if original_image:
+                image_payload = (original_image.name, original_image.getvalue(), f'image/{original_image.type}')
+
+            jobs = {}
+            for locale in target_locales:
+                jobs[locale] = {
+                    "endpoint": "/v1/image/full-localization-pipeline",
+                    "files": {'original_image': image_payload} if image_payload else {},
+                    "data": {**base_data, 'target_locale': locale}
+                }
+
+            # Locales already run for a near-identical image are reused instead of re-sent
+            plan = None
+            cached_locales = {}
+            if dedup_enabled() and image_payload:
+                plan = plan_dedup(
+                    "/v1/image/full-localization-pipeline",
+                    [content_key(jobs[locale]["data"]) for locale in target_locales],
+                    [image_payload[1]] * len(target_locales)
+                )
+                cached_locales = {target_locales[idx]: reused_response(result) for idx, result in plan["cached"].items()}
+                for locale in cached_locales:
+                    del jobs[locale]
+
+            st.subheader("🌐 Localized Gallery")
+            progress = st.progress(0.0, text=f"0/{len(target_locales)} locales complete")
+
+            # One placeholder per locale so results appear as soon as each pipeline finishes
+            gallery_columns = 3
+            placeholders = {}
+            for row_start in range(0, len(target_locales), gallery_columns):
+                row = st.columns(gallery_columns)
+                for col, locale in zip(row, target_locales[row_start:row_start + gallery_columns]):
+                    placeholders[locale] = col.empty()
+                    placeholders[locale].info(f"⏳ {locale}")
+
+            batch_start = time.perf_counter()
+            batch_results = {}
+            for locale, response in cached_locales.items():
+                batch_results[locale] = response
+                with placeholders[locale].container():
+                    render_locale_result(locale, response)
+
+            for locale, response in run_concurrent_requests(jobs, max_concurrency):
+                batch_results[locale] = response
+                with placeholders[locale].container():
+                    render_locale_result(locale, response)
+                completed = len(batch_results)
+                progress.progress(completed / len(target_locales), text=f"{completed}/{len(target_locales)} locales complete")
+
+                if plan and response["success"]:
+                    store_dedup_results(plan, {target_locales.index(locale): response})
+
+            progress.progress(1.0, text=f"{len(target_locales)}/{len(target_locales)} locales complete")
+            if plan:
+                record_dedup_savings(len(cached_locales), len(cached_locales), len(cached_locales) * len(image_payload[1]))
+
+            batch_time = time.perf_counter() - batch_start
+            succeeded = sum(1 for response in batch_results.values() if response["success"])
+            sequential_time = sum(response.get("response_time", 0.0) for response in batch_results.values())
+            st.success(f"✅ {succeeded}/{len(target_locales)} locales completed in {batch_time:.2f}s (sum of per-locale times: {sequential_time:.2f}s)")
+            logger.info(f"Multi-locale localization finished: {succeeded}/{len(target_locales)} succeeded in {batch_time:.2f}s")
+
+            st.session_state.test_results["localization_multi"] = batch_results
+        else:
+            st.warning("⚠️ Please provide an image, at least one locale and the website context")
+            logger.warning("Multi-locale localization attempted with missing inputs")
+
+    if run_localization and not multi_locale:
         if (original_image or image_path) and target_locale and website_context:
             logger.info("User initiated image localization pipeline")
             logger.info(f"Target locale: {target_locale}")
@@ -763,11 +3297,28 @@ with tab5:
                     data_dict['custom_generation_prompt'] = custom_prompt
                     logger.debug("Custom generation prompt provided")
 
-                response = make_api_request("/v1/image/full-localization-pipeline", files=files_dict, data=data_dict)
+                plan = None
+                if dedup_enabled() and original_image:
+                    plan = plan_dedup(
+                        "/v1/image/full-localization-pipeline",
+                        [content_key(data_dict)],
+                        [files_dict['original_image'][1]]
+                    )
+
+                if plan and plan["cached"]:
+                    logger.info("Image localization served from dedup cache")
+                    response = reused_response(plan["cached"][0])
+                    record_dedup_savings(plan["uploads_avoided"], 1, plan["bytes_avoided"])
+                else:
+                    response = make_api_request("/v1/image/full-localization-pipeline", files=files_dict, data=data_dict)
+                    if plan and response["success"]:
+                        store_dedup_results(plan, {0: response})
 
                 if response["success"]:
                     st.session_state.test_results["localization"] = response
                     logger.info("Image localization pipeline completed successfully")
+                    if response.get("status_code") == "cached":
+                        st.info("♻️ Reused an earlier result for a duplicate image, no request sent")
 
                     # Check if response is binary (image) or JSON
                     if response.get("is_binary", False):
@@ -845,29 +3396,53 @@ with tab6:
     if st.session_state.test_results:
         st.subheader("Stored Test Results")
 
-        for test_name, results in st.session_state.test_results.items():
-            with st.expander(f"Test: {test_name}"):
-                st.json(results)
+        # Rendering every stored result on each rerun re-serializes all of it, so only on request
+        # Spilled results are only read back from disk when shown
+        for test_name in st.session_state.test_results:
+            on_disk = " · 💾 on disk" if st.session_state.test_results.is_spilled(test_name) else ""
+            with st.expander(f"Test: {test_name}{on_disk}"):
+                if st.toggle("Show JSON", key=f"show_result_{test_name}"):
+                    st.json(_exportable(st.session_state.test_results[test_name], lambda data: {"binary": True, "size": len(data)}))
+
+        if st.button("Clear All Results"):
+            logger.info("User cleared all test results")
+            st.session_state.test_results.clear()
+            st.rerun()
+    else:
+        st.info("No test results yet. Run some tests to see results here.")
+
+    if st.session_state.test_results.evicted:
+        st.caption(f"🗑️ Evicted to stay within the memory budget: {', '.join(st.session_state.test_results.evicted)}")
+
+    # Export
+    if st.session_state.test_results or st.session_state.request_history:
+        st.subheader("📦 Export Results")
 
         col1, col2 = st.columns(2)
         with col1:
-            if st.button("Export All Results"):
-                all_results = json.dumps(st.session_state.test_results, indent=2)
-                logger.info("User exported all test results")
-                st.download_button(
-                    "Download Results JSON",
-                    data=all_results,
-                    file_name=f"test_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
-                    mime="application/json"
-                )
+            export_format = st.selectbox("Export Format", list(EXPORT_FORMATS.keys()), key="export_format")
 
         with col2:
-            if st.button("Clear All Results"):
-                logger.info("User cleared all test results")
-                st.session_state.test_results = {}
-                st.rerun()
-    else:
-        st.info("No test results yet. Run some tests to see results here.")
+            st.write("")
+            prepare_export = st.button("Export All Results")
+
+        if prepare_export:
+            builder, extension, mime = EXPORT_FORMATS[export_format]
+            logger.info(f"User exported all test results as {export_format}")
+            try:
+                with st.spinner("Preparing export..."):
+                    with builder(st.session_state.test_results, st.session_state.request_history) as export_file:
+                        export_data = export_file.read()
+
+                st.download_button(
+                    f"📥 Download {extension.upper()}",
+                    data=export_data,
+                    file_name=f"test_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}",
+                    mime=mime
+                )
+            except RuntimeError as e:
+                st.error(f"❌ Export failed: {e}")
+                logger.error(f"Export failed: {e}")
 
     # Request Statistics
     if st.session_state.request_history:
@@ -875,7 +3450,12 @@ with tab6:
 
         df = pd.DataFrame(st.session_state.request_history)
 
-        col1, col2, col3 = st.columns(3)
+        # Entries recorded before outcomes were tracked only know success/failure
+        outcome = df['success'].map({True: "success", False: "error"})
+        if 'outcome' in df.columns:
+            outcome = df['outcome'].fillna(outcome)
+
+        col1, col2, col3, col4, col5 = st.columns(5)
 
         with col1:
             total_requests = len(df)
@@ -889,6 +3469,16 @@ with tab6:
             avg_response_time = df[df['success'] == True]['response_time'].mean() if df[df['success'] == True].shape[0] > 0 else 0
             st.metric("Avg Response Time", f"{avg_response_time:.2f}s")
 
+        with col4:
+            streamed = df[df['streamed'] == True] if 'streamed' in df.columns else df.iloc[0:0]
+            avg_first_result = streamed['time_to_first_result'].mean() if len(streamed) > 0 else None
+            st.metric("Avg Time to First Result", f"{avg_first_result:.2f}s" if avg_first_result is not None else "N/A",
+                      help="Streamed responses only")
+
+        with col5:
+            timeouts = int((outcome == "timeout").sum())
+            st.metric("Timeouts", timeouts, help=f"{timeouts / len(df) * 100:.1f}% of requests; {int((outcome == 'cancelled').sum())} cancelled")
+
         # Charts
         st.subheader("Performance Charts")
 
@@ -896,12 +3486,227 @@ with tab6:
         if 'response_time' in df.columns:
             st.line_chart(df[df['success'] == True].set_index('timestamp')['response_time'])
 
-        # Success/Failure distribution
-        success_counts = df['success'].value_counts()
-        st.bar_chart(success_counts)
+        # Outcome distribution (success, error, timeout, cancelled, circuit_open)
+        st.bar_chart(outcome.value_counts())
 
         logger.info(f"Statistics displayed: {total_requests} total requests, {success_rate:.1f}% success rate")
 
+# Tab 7: Record & Replay
+with tab7:
+    st.header("🔁 Replay Recorded Traffic")
+    st.markdown("Re-issue a recorded session against any backend and compare latency and responses")
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.subheader("Replay Archive")
+        archive_source = st.radio("Archive Source", ["Upload", "Local Recording"], horizontal=True, key="replay_source")
+
+        replay_archive_data = None
+        if archive_source == "Upload":
+            archive_upload = st.file_uploader("Upload replay archive", type=['zip'], key="replay_archive_upload")
+            if archive_upload:
+                try:
+                    replay_archive_data = ReplayArchive.from_zip(archive_upload.getvalue())
+                except (zipfile.BadZipFile, KeyError, ValueError) as e:
+                    logger.error(f"Invalid replay archive {archive_upload.name}: {e}")
+                    st.error(f"❌ Not a replay archive (a ZIP with manifest.ndjson): {e}")
+        else:
+            # Operators can replay any session's recording, everyone else only their own
+            candidates = RECORDINGS_DIR.glob("recording_*") if is_operator() and RECORDINGS_DIR.exists() else st.session_state.get("recording_dirs", [])
+            recordings = sorted((path for path in candidates if (path / "manifest.ndjson").exists()), reverse=True)
+            if recordings:
+                selected_recording = st.selectbox("Recording", recordings, format_func=lambda path: path.name, key="replay_recording")
+                try:
+                    replay_archive_data = ReplayArchive.from_directory(selected_recording)
+                except (OSError, ValueError) as e:
+                    logger.error(f"Cannot read recording {selected_recording}: {e}")
+                    st.error(f"❌ Cannot read recording {selected_recording.name}: {e}")
+            else:
+                st.info("No local recordings from this session yet. Enable 'Record requests' in the sidebar.")
+
+        if replay_archive_data is not None:
+            endpoint_counts = pd.Series([entry["endpoint"] for entry in replay_archive_data.entries]).value_counts()
+            st.caption(f"{len(replay_archive_data.entries)} recorded calls")
+            st.dataframe(endpoint_counts.rename("calls"), use_container_width=True)
+
+    with col2:
+        st.subheader("Replay Settings")
+        replay_base_url = st.text_input("Target API Base URL", value=st.session_state.api_base_url, key="replay_base_url")
+        replay_pacing = st.radio("Pacing", ["Original pacing", "As fast as possible"], key="replay_pacing")
+        replay_concurrency = st.slider("Max concurrent requests", min_value=1, max_value=16, value=4, key="replay_concurrency")
+        replay_ignore = st.text_input(
+            "Ignore keys when comparing (comma-separated)",
+            placeholder="request_id, timestamp",
+            key="replay_ignore_keys"
+        )
+
+    if st.button("🚀 Run Replay", type="primary", key="exec_replay"):
+        if replay_archive_data is not None and replay_archive_data.entries and replay_base_url:
+            total = len(replay_archive_data.entries)
+            keep_pacing = replay_pacing == "Original pacing"
+            ignore_keys = frozenset(key.strip() for key in replay_ignore.split(',') if key.strip())
+            logger.info(f"User started replay of {total} calls against {replay_base_url} "
+                        f"(pacing: {keep_pacing}, concurrency: {replay_concurrency})")
+
+            progress = st.progress(0.0, text=f"0/{total} calls replayed")
+            rows = []
+            for row in replay_archive(replay_archive_data, replay_base_url, st.session_state.api_key,
+                                      keep_pacing, replay_concurrency, ignore_keys,
+                                      st.session_state.endpoint_deadlines):
+                rows.append(row)
+                progress.progress(len(rows) / total, text=f"{len(rows)}/{total} calls replayed")
+
+            summary = summarize_replay(rows)
+            mismatched = sum(1 for row in rows if row["differences"])
+            logger.info(f"Replay finished: {total} calls, {mismatched} with response differences")
+
+            if mismatched:
+                st.warning(f"⚠️ {mismatched}/{total} replayed calls returned different responses")
+            else:
+                st.success(f"✅ All {total} replayed calls matched the recorded responses")
+
+            st.subheader("Per-Endpoint Latency")
+            st.dataframe(summary, use_container_width=True, hide_index=True)
+            st.bar_chart(summary.set_index("endpoint")[["recorded_mean", "replay_mean"]])
+
+            st.subheader("Response Differences")
+            for row in sorted(rows, key=lambda row: row["index"]):
+                if row["diffs"]:
+                    with st.expander(f"#{row['index']} {row['endpoint']} ({row['differences']} differences)"):
+                        for diff in row["diffs"]:
+                            st.text(diff)
+
+            st.session_state.test_results["replay"] = {
+                "base_url": replay_base_url,
+                "summary": summary.to_dict(orient="records"),
+                "calls": sorted(rows, key=lambda row: row["index"])
+            }
+        else:
+            st.warning("Please select a replay archive with recorded calls and a target URL")
+            logger.warning("Replay attempted without archive or target URL")
+
+# Tab 8: Synthetic Corpus Generator
+with tab8:
+    st.header("🧬 Synthetic Corpus Generator")
+    st.markdown("Generate seeded, repeatable DOMX documents and images for scale testing. "
+                "The same seed and settings always produce the same corpus.")
+
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        st.subheader("Documents")
+        corpus_seed = st.number_input("Seed", min_value=0, value=42, step=1, key="corpus_seed")
+        corpus_file_count = st.number_input("Number of files", min_value=1, max_value=1000, value=10, key="corpus_file_count")
+        corpus_nodes = st.slider("Nodes per file (min/max)", min_value=1, max_value=10000, value=(50, 200), key="corpus_nodes")
+        corpus_duplicate_ratio = st.slider("Duplicate text ratio", min_value=0.0, max_value=1.0, value=0.2, step=0.05,
+                                           key="corpus_duplicate_ratio",
+                                           help="Probability that a node reuses text already used elsewhere in the corpus")
+
+    with col2:
+        st.subheader("Text")
+        corpus_distribution = st.selectbox("Text length distribution", ["Uniform", "Normal", "Long tail"], key="corpus_distribution")
+        corpus_mean_words = st.number_input("Mean words per node", min_value=1, max_value=500, value=8, key="corpus_mean_words")
+        corpus_max_words = st.number_input("Max words per node", min_value=1, max_value=5000, value=60, key="corpus_max_words")
+
+        st.markdown("**Node type mix (relative weights)**")
+        corpus_type_weights = {}
+        weight_cols = st.columns(2)
+        default_weights = {"heading": 1.0, "paragraph": 4.0, "button": 2.0, "link": 2.0, "label": 1.0, "list_item": 2.0}
+        for idx, node_type in enumerate(CORPUS_NODE_TYPES):
+            with weight_cols[idx % 2]:
+                corpus_type_weights[node_type] = st.number_input(
+                    node_type, min_value=0.0, value=default_weights[node_type], step=0.5, key=f"corpus_weight_{node_type}"
+                )
+
+    with col3:
+        st.subheader("Images")
+        corpus_generate_images = st.checkbox("Generate one image per file", value=True, key="corpus_generate_images")
+        corpus_image_width = st.number_input("Width (px)", min_value=8, max_value=10000, value=1280, key="corpus_image_width",
+                                             disabled=not corpus_generate_images)
+        corpus_image_height = st.number_input("Height (px)", min_value=8, max_value=10000, value=720, key="corpus_image_height",
+                                              disabled=not corpus_generate_images)
+        corpus_image_format = st.selectbox("Format", list(CORPUS_IMAGE_FORMATS), key="corpus_image_format",
+                                           disabled=not corpus_generate_images)
+        corpus_image_style = st.radio("Content", ["Shapes", "Noise"], horizontal=True, key="corpus_image_style",
+                                      disabled=not corpus_generate_images,
+                                      help="Noise images do not compress, e.g. 2600x2600 PNG ≈ 20 MB")
+
+    if st.button("🧬 Generate Corpus", type="primary", key="exec_generate_corpus"):
+        if sum(corpus_type_weights.values()) <= 0:
+            st.warning("Please give at least one node type a positive weight")
+            logger.warning("Corpus generation attempted with all node type weights at zero")
+        else:
+            corpus_params = {
+                "seed": int(corpus_seed),
+                "file_count": int(corpus_file_count),
+                "min_nodes": corpus_nodes[0],
+                "max_nodes": corpus_nodes[1],
+                "type_weights": {node_type: weight for node_type, weight in corpus_type_weights.items() if weight > 0},
+                "text_distribution": corpus_distribution,
+                "mean_words": int(corpus_mean_words),
+                "max_words": int(max(corpus_max_words, 1)),
+                "duplicate_ratio": corpus_duplicate_ratio,
+                "generate_images": corpus_generate_images,
+                "image_width": int(corpus_image_width),
+                "image_height": int(corpus_image_height),
+                "image_format": corpus_image_format,
+                "image_style": corpus_image_style
+            }
+            logger.info(f"User generated corpus: {corpus_params}")
+
+            with st.spinner("Generating corpus..."):
+                generation_start = time.perf_counter()
+                st.session_state.corpus = generate_corpus(corpus_params)
+                generation_time = time.perf_counter() - generation_start
+            st.session_state.pop("corpus_archive", None)
+            st.success(f"✅ Corpus generated in {generation_time:.2f}s")
+
+    corpus = st.session_state.get("corpus")
+    if corpus:
+        st.subheader("Current Corpus")
+        json_bytes = sum(corpus_file.size for corpus_file in corpus["json_files"])
+        image_bytes = sum(corpus_file.size for corpus_file in corpus["images"])
+
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Files", len(corpus["json_files"]))
+        with col2:
+            st.metric("Total Nodes", f"{corpus['total_nodes']:,}")
+        with col3:
+            st.metric("JSON Size", f"{json_bytes / (1024 * 1024):.2f} MB")
+        with col4:
+            st.metric("Image Size", f"{image_bytes / (1024 * 1024):.2f} MB")
+
+        st.caption(f"{corpus['unique_texts']:,} unique texts across {corpus['total_nodes']:,} nodes · "
+                   "tick 'Use generated corpus' in any tab to send it instead of uploaded files")
+
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("Prepare ZIP", key="prepare_corpus_archive"):
+                with st.spinner("Building ZIP..."):
+                    with build_corpus_archive(corpus) as archive_file:
+                        st.session_state.corpus_archive = archive_file.read()
+            if st.session_state.get("corpus_archive"):
+                st.download_button(
+                    "📥 Download Corpus ZIP",
+                    data=st.session_state.corpus_archive,
+                    file_name=f"corpus_seed{corpus['params']['seed']}_{len(corpus['json_files'])}files.zip",
+                    mime="application/zip"
+                )
+        with col2:
+            if st.button("Clear Corpus", key="clear_corpus"):
+                logger.info("User cleared generated corpus")
+                st.session_state.pop("corpus", None)
+                st.session_state.pop("corpus_archive", None)
+                st.rerun()
+
+        with st.expander("Preview first document"):
+            st.json(json_loads(corpus["json_files"][0].getvalue()), expanded=False)
+        if corpus["images"]:
+            with st.expander("Preview first image"):
+                st.image(corpus["images"][0].getvalue(), caption=corpus["images"][0].name)
+
 # Footer
 st.divider()
 st.markdown("""
@@ -912,4 +3717,22 @@ st.markdown("""
 
 # Log application state on completion
 logger.info(f"Session state - Request history: {len(st.session_state.request_history)} entries")
-logger.info(f"Session state - Test results: {len(st.session_state.test_results)} tests stored")
\ No newline at end of file
+logger.info(f"Session state - Test results: {len(st.session_state.test_results)} tests stored")
+
+# Memory budgets (after this run's results are stored)
+enforce_memory_budgets()
+
+# Profiling report (operator mode)
+active_profile = st.session_state.pop("active_profile", None)
+if active_profile is not None:
+    finish_profile(active_profile)
+
+if is_operator() and st.session_state.get("profile_results"):
+    st.divider()
+    st.subheader("🔬 Profiling Reports")
+    render_profile_reports()
+
+if is_operator():
+    st.divider()
+    st.subheader("🧠 Session Memory")
+    render_memory_admin()
\ No newline at end of file